@@ -1,24 +1,40 @@
-from flask import Flask, request, jsonify
-import torch
-import pandas as pd
-import warnings
 import time
-import numpy as np
+
+_import_start = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, stream_with_context
+import warnings
 from statistics import mode
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import undetected_chromedriver as uc
-from selenium.webdriver.chrome.options import Options
 from flask_cors import CORS
-import spacy
-from transformers import AutoTokenizer, AutoModel, pipeline
-from sklearn.metrics.pairwise import cosine_similarity
 import pymongo
 import os
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import traceback
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from models import ModelRegistry
+import model_bundle
+from quantization import QUANTIZE_MODELS, quantize_dynamic, quantize_pipeline
+from sentiment import (
+    SENTIMENT_BACKEND, TfidfMlpBackend, TransformerBackend,
+    available_backends, get_backend, register_backend,
+)
+from keyphrases import (
+    KEYPHRASE_RANKER, PHRASE_TABLE_DIR, KeyphraseEngine, StaticTableRanker, TfidfRanker, load_noun_chunker,
+)
+from inference_scheduler import InferenceScheduler
+from summarizer import ExtractiveSummarizer
+from aspects import aspect_sentiment
+from embedding_store import EmbeddingStore
+from browser_profile import load_stats
+from metrics import (
+    REGISTRY, cache_lookups, current_trace, end_trace, reviews_scraped, span, start_trace, timed_iter,
+)
+from redirects import resolve_short_link
+from jobs import JobManager
+from streaming import analyze_pages, sse_event
+from result_cache import ResultCache, SingleFlight
+from canonical import product_key
 
 # ----------------------------------------------------------------------------- #
 # 🧠  SETUP
@@ -29,6 +45,14 @@ warnings.filterwarnings("ignore", category=ResourceWarning)
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
+# requests sending this header get per-stage timings in the body and a Server-Timing header
+DEBUG_TIMINGS_HEADER = os.getenv("DEBUG_TIMINGS_HEADER", "X-Debug-Timings")
+# skip the background warm-up; every model then loads on its first request
+FAST_START = os.getenv("FAST_START", "0") == "1"
+# keep BERT review embeddings on disk for /similar (needs the BERT keyphrase ranker); off by
+# default since it embeds every review of each new product, roughly doubling BERT CPU per product
+EMBEDDING_STORE_ENABLED = os.getenv("EMBEDDING_STORE", "0") == "1" and KEYPHRASE_RANKER not in ("tfidf", "static")
+
 # ----------------------------------------------------------------------------- #
 # ⚙️ MongoDB setup
 # ----------------------------------------------------------------------------- #
@@ -40,264 +64,467 @@ mongo_client = pymongo.MongoClient(mongo_uri)
 db = mongo_client[mongo_db]
 search_history = db[mongo_collection]
 
+result_cache = ResultCache(search_history)
+inflight = SingleFlight()
+
 # ----------------------------------------------------------------------------- #
-# 🧠 Load NLP + Sentiment models once at startup
+# 🧠 NLP + Sentiment models, loaded on first use or by the warm-up thread
 # ----------------------------------------------------------------------------- #
-print("[INFO] Loading SpaCy and HuggingFace models (this may take a while)...")
-try:
-    nlp = spacy.load("en_core_web_sm")
-    tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-    bert_model = AutoModel.from_pretrained("bert-base-uncased")
-    sentiment_pipeline = pipeline("sentiment-analysis")
-    MODELS_LOADED = True
-    print("[INFO] Models loaded successfully ✅")
-except Exception as e:
-    MODELS_LOADED = False
-    print(f"[ERROR] Model loading failed: {e}")
+models = ModelRegistry()
+# one inference thread micro-batches embedding and sentiment work across requests
+scheduler = InferenceScheduler()
+
+
+def load_spacy():
+    return load_noun_chunker(models.timed_import("spacy"))
+
+
+def load_bert():
+    if model_bundle.bundle_available():
+        return model_bundle.load_bert()
+    transformers = models.timed_import("transformers")
+    tokenizer = transformers.AutoTokenizer.from_pretrained("bert-base-uncased")
+    bert_model = transformers.AutoModel.from_pretrained("bert-base-uncased")
+    bert_model.eval()
+    if QUANTIZE_MODELS:
+        bert_model = quantize_dynamic(bert_model)
+    return tokenizer, bert_model
+
+
+def load_sentiment_pipeline():
+    if model_bundle.bundle_available():
+        return model_bundle.load_sentiment_pipeline()
+    pipe = models.timed_import("transformers").pipeline("sentiment-analysis")
+    return quantize_pipeline(pipe) if QUANTIZE_MODELS else pipe
+
+
+def load_keyphrase_engine():
+    if KEYPHRASE_RANKER == "tfidf":
+        ranker = TfidfRanker(get_backend(TfidfMlpBackend.name).vectorizer)
+        return KeyphraseEngine(models.get("spacy"), ranker=ranker)
+    if KEYPHRASE_RANKER == "static":
+        return KeyphraseEngine(models.get("spacy"), ranker=StaticTableRanker(PHRASE_TABLE_DIR))
+    tokenizer, bert_model = models.get("bert")
+    engine = KeyphraseEngine(models.get("spacy"), tokenizer, bert_model,
+                             embed_fn=lambda texts: scheduler.run("embed", texts))
+    scheduler.register("embed", engine.embed)
+    return engine
+
+
+def load_summarizer():
+    # reuses the TF-IDF vocabulary / idf shipped for the tfidf-mlp sentiment model
+    return ExtractiveSummarizer(get_backend(TfidfMlpBackend.name).vectorizer.transform)
+
+
+models.register("scrapers", lambda: models.timed_import("scrapers"))
+models.register("pandas", lambda: models.timed_import("pandas"))
+models.register("spacy", load_spacy)
+if KEYPHRASE_RANKER not in ("tfidf", "static"):
+    # the tfidf / static keyphrase rankers never touch the BERT encoder
+    models.register("bert", load_bert)
+models.register("sentiment_pipeline", load_sentiment_pipeline)
+models.register("keyphrase_engine", load_keyphrase_engine)
+models.register("summarizer", load_summarizer)
+if EMBEDDING_STORE_ENABLED:
+    models.register("embedding_store", EmbeddingStore)
+register_backend(TransformerBackend.name, lambda: TransformerBackend(models.get("sentiment_pipeline")))
+if model_bundle.bundle_available():
+    print(f"[INFO] Serving pre-compiled model bundle from {model_bundle.MODEL_BUNDLE_DIR}")
+    register_backend(TfidfMlpBackend.name, model_bundle.load_tfidf_backend)
+
+# what /scrape with the default backend cannot run without; the summarizer and the
+# embedding store only degrade the response when missing
+REQUIRED_COMPONENTS = [name for name in ("scrapers", "pandas", "spacy", "bert", "keyphrase_engine") if name in models]
+if SENTIMENT_BACKEND == TransformerBackend.name:
+    REQUIRED_COMPONENTS.append("sentiment_pipeline")
+
+STARTUP_IMPORT_SECONDS = round(time.perf_counter() - _import_start, 3)
+print(f"[INFO] Service modules imported in {STARTUP_IMPORT_SECONDS:.2f}s")
+# not a lazy component: no request path loads it, and expiry cleanup must not wait on warm-up
+threading.Thread(target=result_cache.ensure_indexes, name="mongo-indexes", daemon=True).start()
+if not FAST_START:
+    models.warm_up()
 
 # ----------------------------------------------------------------------------- #
 # 🧰 Utility Functions
 # ----------------------------------------------------------------------------- #
-CHROME_PATH = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+def analysis_key(product_url, backend=SENTIMENT_BACKEND):
+    """Cache / dedupe key: canonical product id, suffixed for non-transformer sentiment backends."""
+    key = product_key(product_url)
+    return key if backend == TransformerBackend.name else f"{key}#{backend}"
 
-def check_cached_results(product_url):
-    """Check MongoDB cache for a URL within the last 30 days."""
-    try:
-        cached_result = search_history.find_one(
-            {"searchUrl": product_url}, sort=[("timestamp", pymongo.DESCENDING)]
-        )
-        if cached_result:
-            cache_time = cached_result["timestamp"]
-            if cache_time > datetime.utcnow() - timedelta(days=30):
-                return cached_result["searchResponse"]
-    except Exception as e:
-        print(f"[WARN] Cache check failed: {e}")
-    return None
+
+def check_cached_results(product_url, backend=SENTIMENT_BACKEND):
+    """Look up a recent analysis in the in-memory tier, then MongoDB (expired by TTL index)."""
+    with span("cache_lookup"):
+        cached = result_cache.get(analysis_key(product_url, backend))
+    cache_lookups.inc(outcome="hit" if cached else "miss")
+    return cached
 
 
 def resolve_redirects(url):
-    """Resolve Amazon short links using a tiny headless browser."""
+    """Resolve Amazon short links over HTTP, using a pooled browser only as a fallback."""
     try:
-        if "amzn.in" not in url:
-            return url
-
-        print("[INFO] Resolving Amazon short link via headless browser...")
+        with span("resolve_redirects"):
+            resolved_url = resolve_short_link(
+                url, browser_fallback=lambda u: models.get("scrapers").resolve_with_browser(u)
+            )
+        if resolved_url != url:
+            print(f"[INFO] Short link resolved to: {resolved_url}")
+        return resolved_url
 
-        options = uc.ChromeOptions()
-        options.binary_location = CHROME_PATH
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
+    except Exception as e:
+        print(f"[WARN] Redirect resolution failed: {e}")
+        return url
 
-        browser = uc.Chrome(
-            options=options,
-            browser_executable_path=CHROME_PATH
-        )
 
-        browser.get(url)
-        time.sleep(3)
-        resolved_url = browser.current_url
-        browser.quit()
+def analyze_keyphrases(reviews, labels, scores, top_n=10):
+    """Keyphrases, their stats and per-aspect sentiment from one keyphrase ranking."""
+    engine = models.get("keyphrase_engine")
+    with span("keyphrases"):
+        ranking = engine.rank(reviews)
+    try:
+        with span("aspects"):
+            aspects = aspect_sentiment(ranking, engine.phrase_vectors(ranking.keys), labels, scores)
+    except Exception as e:
+        print(f"[WARN] Aspect sentiment failed: {e}")
+        aspects = []
+    return ranking.top(top_n), ranking.stats, aspects
 
-        print(f"[INFO] Short link resolved to: {resolved_url}")
-        return resolved_url
 
+def generate_review_summary(reviews):
+    try:
+        if not any(r.strip() for r in reviews):
+            return ""
+        with span("summary"):
+            return models.get("summarizer").summarize(reviews)
     except Exception as e:
-        print(f"[WARN] Redirect resolution failed: {e}")
-        return url
+        print(f"[WARN] Summary generation failed: {e}")
+        return ""
+
 
+def embed_reviews(texts):
+    models.get("keyphrase_engine")  # registers the scheduler's "embed" handler
+    return scheduler.run("embed", texts)
 
-def setup_browser():
-    """Configure headless Chrome for scraping."""
-    options = uc.ChromeOptions()
-    options.binary_location = CHROME_PATH
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
 
-    return uc.Chrome(
-        options=options,
-        browser_executable_path=CHROME_PATH
+def store_review_embeddings(product_url, texts):
+    """Embed the reviews of a product not seen before and add them to the embedding store."""
+    try:
+        _, embedded = models.get("embedding_store").get_or_embed(
+            product_key(product_url), texts, embed_reviews, product_url
+        )
+        print(f"[INFO] Embedding store: {embedded} new of {len(texts)} reviews for {product_url}")
+    except Exception as e:
+        print(f"[WARN] Storing review embeddings failed: {e}")
+
+
+# off the request path: embedding hundreds of reviews would delay the response
+embedding_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-store")
+
+
+def analyze_product(product_url, backend=SENTIMENT_BACKEND):
+    """Cache-check, scrape and analyze one resolved product URL. Returns (body, http_status)."""
+    cached = check_cached_results(product_url, backend)
+    if cached:
+        return {"status": "success", "cached": True, **cached}, 200
+    # concurrent misses for the same URL wait for one scrape instead of each launching one
+    return inflight.do(analysis_key(product_url, backend), scrape_and_analyze, product_url, backend)
+
+
+def scrape_and_analyze(product_url, backend=SENTIMENT_BACKEND):
+    for event, payload in leader_events(product_url, backend):
+        if event == "result":
+            return payload
+
+
+def leader_events(product_url, backend=SENTIMENT_BACKEND):
+    """`analysis_events`, unless a result was cached while waiting for an earlier flight."""
+    cached = check_cached_results(product_url, backend)
+    if cached:
+        yield "result", ({"status": "success", "cached": True, **cached}, 200)
+        return
+    yield from analysis_events(product_url, backend)
+
+
+def sentiment_submitter(backend=SENTIMENT_BACKEND):
+    """`submit(texts) -> Future` for analyze_pages. Only torch backends share the inference thread."""
+    model = get_backend(backend)
+    if getattr(model, "uses_torch", True):
+        kind = f"sentiment:{backend}"
+        scheduler.batched(kind, model.predict)
+        return lambda texts: scheduler.submit(kind, texts)
+
+    def submit(texts):
+        future = Future()
+        with span(f"inference:sentiment:{backend}"):
+            future.set_result(model.predict(texts))
+        return future
+
+    return submit
+
+
+def analysis_events(product_url, backend=SENTIMENT_BACKEND):
+    """
+    Scrape and analyze a product incrementally. Yields ("reviews", records) for
+    every analyzed batch of pages, then ("result", (body, http_status)).
+    """
+    submit = sentiment_submitter(backend)
+    analyzed = []
+    site = "amazon" if "amazon" in product_url else "flipkart"
+    pages = models.get("scrapers").iter_review_pages(product_url)
+    # covers page loads plus any wait for the last sentiment batch
+    for records in timed_iter(analyze_pages(pages, submit), "scrape"):
+        analyzed.extend(records)
+        reviews_scraped.inc(len(records), site=site)
+        yield "reviews", records
+
+    if not analyzed:
+        yield "result", ({"status": "warning", "message": "No reviews found"}, 200)
+        return
+
+    df = models.get("pandas").DataFrame(analyzed)
+    keyphrases, keyphrase_stats, aspects = analyze_keyphrases(
+        df["review_text"].tolist(), df["predicted_sentiment"].tolist(), df["sentiment_score"].tolist()
     )
+    summary = generate_review_summary(df["review_text"].tolist())
+    overall_sentiment = mode(df["predicted_sentiment"].tolist())
 
+    response = {
+        "status": "success",
+        "total_reviews": len(df),
+        "overall_sentiment": overall_sentiment,
+        "sentiment_backend": backend,
+        "keyphrases": keyphrases,
+        "keyphrase_stats": keyphrase_stats,
+        "aspects": aspects,
+        "summary": summary,
+        "reviews": df.to_dict(orient="records"),
+    }
 
-def normalize_reviews(reviews):
-    min_len = min(len(reviews["review_text"]), len(reviews["rating"]), len(reviews["review_title"]))
-    for key in reviews:
-        reviews[key] = reviews[key][:min_len]
-    return reviews
+    with span("mongo_write"):
+        result_cache.put(analysis_key(product_url, backend), response, url=product_url)
+    if EMBEDDING_STORE_ENABLED:
+        embedding_executor.submit(store_review_embeddings, product_url, df["review_text"].tolist())
+    yield "result", (response, 200)
 
 
-def get_amazon_reviews(browser, url):
-    reviews = {"review_text": [], "rating": [], "review_title": []}
-    browser.get(url)
-    time.sleep(3)
+job_manager = JobManager()
 
-    for _ in range(3):
-        try:
-            review_elements = browser.find_elements(By.CSS_SELECTOR, 'span[data-hook="review-body"]')
-            rating_elements = browser.find_elements(By.CLASS_NAME, "review-rating")
-            title_elements = browser.find_elements(By.CSS_SELECTOR, 'a[data-hook="review-title"]')
 
-            for review in review_elements:
-                reviews["review_text"].append(review.text.strip())
+def unknown_backend_response():
+    message = f"Unknown sentiment backend. Use one of {available_backends()}"
+    return jsonify({"status": "error", "message": message}), 400
 
-            for rating in rating_elements:
-                val = rating.get_attribute("textContent").replace(" out of 5 stars", "")
-                try:
-                    reviews["rating"].append(float(val))
-                except:
-                    reviews["rating"].append(None)
 
-            for title in title_elements:
-                reviews["review_title"].append(title.text.strip())
+# ----------------------------------------------------------------------------- #
+# 🚀 ROUTES
+# ----------------------------------------------------------------------------- #
+REGISTRY.register_collector("feedback_result_cache", lambda: {**result_cache.stats(), "coalesced": inflight.coalesced})
+REGISTRY.register_collector("feedback_inference", scheduler.stats)
+REGISTRY.register_collector("feedback_scraping", load_stats.summary)
+REGISTRY.register_collector("feedback_components_ready",
+                            lambda: {"required": models.ready(REQUIRED_COMPONENTS), "all": models.all_ready})
 
-        except Exception as e:
-            print(f"[WARN] Error while scraping reviews: {e}")
-            break
 
-    return normalize_reviews(reviews)
+@app.before_request
+def start_request_trace():
+    if request.headers.get(DEBUG_TIMINGS_HEADER):
+        start_trace()
 
 
-def get_flipkart_reviews(browser, url):
-    reviews = {"review_text": [], "rating": [], "review_title": []}
-    browser.get(url)
-    time.sleep(3)
-    wait = WebDriverWait(browser, 15)
+@app.after_request
+def add_server_timing(response):
+    trace = current_trace()
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
-    for _ in range(2):
-        try:
-            review_elements = browser.find_elements(By.CLASS_NAME, "ZmyHeo")
-            for review in review_elements:
-                reviews["review_text"].append(review.text.strip())
-
-            rating_elements = browser.find_elements(By.CLASS_NAME, "XQDdHH")
-            for rating in rating_elements:
-                try:
-                    reviews["rating"].append(float(rating.text.split()[0]))
-                except:
-                    reviews["rating"].append(None)
-
-            title_elements = browser.find_elements(By.CSS_SELECTOR, "p.z9E0IG")
-            for title in title_elements:
-                reviews["review_title"].append(title.text.strip())
-
-            try:
-                next_button = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, '//a[@class="_9QVEpD"]/span[contains(text(),"Next")]'))
-                )
-                browser.execute_script("arguments[0].scrollIntoView();", next_button)
-                time.sleep(2)
-                next_button.click()
-                time.sleep(3)
-            except:
-                break
 
-        except Exception as e:
-            print(f"[WARN] Flipkart scraping stopped: {e}")
-            break
+@app.teardown_request
+def end_request_trace(_error=None):
+    end_trace()
 
-    return normalize_reviews(reviews)
 
-
-def get_reviews_ratings(product_url):
-    browser = setup_browser()
+@app.route("/scrape", methods=["POST"])
+def scrape():
     try:
-        if "amazon" in product_url:
-            print(f"[INFO] Launching browser for: {product_url}")
-            return get_amazon_reviews(browser, product_url)
-        elif "flipkart" in product_url:
-            return get_flipkart_reviews(browser, product_url)
-        else:
-            raise ValueError("Unsupported website. Only Amazon and Flipkart are supported.")
-    finally:
-        browser.quit()
+        data = request.json
+        product_url = data.get("productUrl")
+        if not product_url:
+            return jsonify({"status": "error", "message": "No product URL provided"}), 400
 
+        backend = data.get("sentimentBackend") or SENTIMENT_BACKEND
+        if backend not in available_backends():
+            return unknown_backend_response()
 
-def extract_keyphrases(text, top_n=5):
-    doc = nlp(text)
-    noun_phrases = [chunk.text for chunk in doc.noun_chunks]
-    if not noun_phrases:
-        return []
-    doc_emb = get_bert_embedding(text)
-    phrase_embs = [get_bert_embedding(phrase) for phrase in noun_phrases]
-    sims = cosine_similarity([doc_emb], phrase_embs)[0]
-    top_idx = np.argsort(sims)[::-1][:top_n]
-    return [noun_phrases[i] for i in top_idx]
+        product_url = resolve_redirects(product_url)
+        print(f"[DEBUG] Final resolved URL → {product_url}")
 
+        body, status = analyze_product(product_url, backend)
+        trace = current_trace()
+        if trace is not None:
+            body = {**body, "timings": trace.summary()}
+        return jsonify(body), status
 
-def get_bert_embedding(text):
-    inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-    with torch.no_grad():
-        outputs = bert_model(**inputs)
-    return outputs.last_hidden_state.mean(dim=1).squeeze().numpy()
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({"status": "error", "message": str(e)}), 500
 
 
-def generate_review_summary(reviews):
-    try:
-        combined = " ".join(reviews)
-        if not combined.strip():
-            return ""
-        return combined[:400]
-    except Exception as e:
-        print(f"[WARN] Summary generation failed: {e}")
-        return ""
+@app.route("/scrape/stream", methods=["GET"])
+def scrape_stream():
+    """Server-sent events: a "reviews" event per analyzed batch of pages, then one "result" event."""
+    product_url = request.args.get("productUrl")
+    if not product_url:
+        return jsonify({"status": "error", "message": "No product URL provided"}), 400
+    backend = request.args.get("sentimentBackend") or SENTIMENT_BACKEND
+    if backend not in available_backends():
+        return unknown_backend_response()
 
+    product_url = resolve_redirects(product_url)
 
-# ----------------------------------------------------------------------------- #
-# 🚀 ROUTE
-# ----------------------------------------------------------------------------- #
-@app.route("/scrape", methods=["POST"])
-def scrape():
-    try:
-        if not MODELS_LOADED:
-            return jsonify({"status": "error", "message": "Models are still loading. Try again."}), 503
+    def events():
+        try:
+            cached = check_cached_results(product_url, backend)
+            if cached:
+                yield sse_event("result", {"status": "success", "cached": True, **cached})
+                return
+            received = 0
+            # shares the flight with /scrape and other streams for the same product;
+            # joining an in-flight scrape yields only its "result" event
+            key = analysis_key(product_url, backend)
+            for event, payload in inflight.do_events(key, leader_events, product_url, backend):
+                if event == "reviews":
+                    received += len(payload)
+                    yield sse_event("reviews", {"reviews": payload, "received": received})
+                else:
+                    yield sse_event("result", payload[0])
+        except Exception as e:
+            print(traceback.format_exc())
+            yield sse_event("error", {"status": "error", "message": str(e)})
 
-        data = request.json
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers=headers)
+
+
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    """Queue a scrape-and-analyze job and return its id immediately."""
+    try:
+        data = request.get_json(silent=True) or {}
         product_url = data.get("productUrl")
         if not product_url:
             return jsonify({"status": "error", "message": "No product URL provided"}), 400
 
+        backend = data.get("sentimentBackend") or SENTIMENT_BACKEND
+        if backend not in available_backends():
+            return unknown_backend_response()
+
         product_url = resolve_redirects(product_url)
-        print(f"[DEBUG] Final resolved URL → {product_url}")
+        job, created = job_manager.submit(analysis_key(product_url, backend), analyze_product, product_url, backend)
+        print(f"[INFO] Job {job.id} {'queued' if created else 'reused'} for {product_url}")
+        return jsonify({**job.to_dict(include_result=False), "deduplicated": not created}), 202
 
-        cached = check_cached_results(product_url)
-        if cached:
-            return jsonify({"status": "success", "cached": True, **cached})
-
-        reviews = get_reviews_ratings(product_url)
-        df = pd.DataFrame(reviews)
-        if df.empty:
-            return jsonify({"status": "warning", "message": "No reviews found"}), 200
-
-        keyphrases = extract_keyphrases(" ".join(df["review_text"].head(7)), top_n=10)
-        summary = generate_review_summary(df["review_text"].head(7).tolist())
-
-        sentiments = [sentiment_pipeline(text[:512])[0]["label"] for text in df["review_text"]]
-        df["predicted_sentiment"] = sentiments
-        overall_sentiment = mode(sentiments)
-
-        response = {
-            "status": "success",
-            "total_reviews": len(df),
-            "overall_sentiment": overall_sentiment,
-            "keyphrases": keyphrases,
-            "summary": summary,
-            "reviews": df.to_dict(orient="records"),
-        }
-
-        search_history.insert_one(
-            {"searchUrl": product_url, "searchResponse": response, "timestamp": datetime.utcnow()}
-        )
-        return jsonify(response)
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Poll a job's status; the analysis result is included once it is done."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown or expired job id"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+def service_ready():
+    # fast-start pods load components on demand, so nothing would ever warm them for a probe
+    return FAST_START or models.ready(REQUIRED_COMPONENTS)
+
+
+def health_body():
+    return {
+        "live": True,
+        "ready": service_ready(),
+        "fast_start": FAST_START,
+        "required_components": REQUIRED_COMPONENTS,
+        "components": models.status(),
+        "import_seconds": {"service": STARTUP_IMPORT_SECONDS, **models.import_seconds},
+        "inference": scheduler.stats(),
+        "scraping": load_stats.summary(),
+    }
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Liveness and per-component readiness in one payload."""
+    return jsonify(health_body()), 200
+
+
+@app.route("/health/live", methods=["GET"])
+def health_live():
+    return jsonify({"live": True}), 200
+
+
+@app.route("/health/ready", methods=["GET"])
+def health_ready():
+    """503 until the components /scrape needs have loaded (always 200 with FAST_START), for readiness probes."""
+    body = health_body()
+    return jsonify(body), 200 if body["ready"] else 503
+
+
+@app.route("/similar", methods=["GET"])
+def similar():
+    """
+    Similar reviews to `text`, or to the reviews of `productUrl` together with
+    similar products. `k` bounds each list.
+    """
+    if not EMBEDDING_STORE_ENABLED:
+        return jsonify({"status": "error", "message": "Embedding store is disabled"}), 404
+    try:
+        text = request.args.get("text")
+        product_url = request.args.get("productUrl")
+        try:
+            k = int(request.args.get("k", 10))
+        except ValueError:
+            return jsonify({"status": "error", "message": "k must be an integer"}), 400
+        k = max(1, min(k, 100))
+        if not text and not product_url:
+            return jsonify({"status": "error", "message": "Provide text or productUrl"}), 400
+
+        store = models.get("embedding_store")
+        body = {"status": "success", "stored_reviews": len(store)}
+        if text:
+            body["reviews"] = store.similar_reviews(embed_reviews([text])[0], k)
+        else:
+            key = product_key(resolve_redirects(product_url))
+            centroid = store.product_centroid(key)
+            if centroid is None:
+                return jsonify({"status": "error", "message": "Product has not been analyzed yet"}), 404
+            body["product_key"] = key
+            body["products"] = store.similar_products(key, k)
+            body["reviews"] = store.similar_reviews(centroid, k, exclude_product_key=key)
+        return jsonify(body), 200
 
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of stage histograms, counters and component stats."""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({**result_cache.stats(), "coalesced_requests": inflight.coalesced}), 200
+
+
 # ----------------------------------------------------------------------------- #
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
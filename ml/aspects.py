@@ -0,0 +1,79 @@
+"""
+Aspect-level sentiment over the top keyphrases.
+
+Every candidate noun phrase is assigned to its most similar top keyphrase (the
+"aspect") if the cosine reaches ASPECT_MIN_SIMILARITY, using the phrase vectors
+the keyphrase ranker already produced. With R reviews, C candidates, K aspects
+and L labels everything after that is matrix algebra:
+
+    mentions (R x C) @ assignment (C x K)  ->  review mentions aspect (R x K)
+    hits.T (K x R)   @ one-hot labels (R x L) ->  label counts per aspect
+    hits.T (K x R)   @ confidences (R)        ->  summed confidence per aspect
+"""
+import os
+
+import numpy as np
+
+ASPECT_COUNT = int(os.getenv("ASPECT_COUNT", "10"))
+ASPECT_MIN_SIMILARITY = float(os.getenv("ASPECT_MIN_SIMILARITY", "0.6"))
+
+
+def _cosine_matrix(vectors, columns):
+    """Cosine of every row of `vectors` with the rows listed in `columns`, shape (C, K)."""
+    if hasattr(vectors, "toarray"):
+        # TF-IDF rows are already L2-normalized
+        return np.asarray((vectors @ vectors[columns].T).toarray(), dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+    return unit @ unit[columns].T
+
+
+def assign_aspects(vectors, aspect_idx, min_similarity=ASPECT_MIN_SIMILARITY):
+    """(C, K) 0/1 matrix mapping each candidate to its nearest aspect, if close enough."""
+    sims = _cosine_matrix(vectors, aspect_idx)
+    assignment = np.zeros_like(sims)
+    nearest = sims.argmax(axis=1)
+    rows = np.arange(len(sims))
+    assignment[rows, nearest] = sims[rows, nearest] >= min_similarity
+    # an aspect always covers its own phrase, even if a duplicate vector won the argmax
+    assignment[aspect_idx, np.arange(len(aspect_idx))] = 1.0
+    return assignment
+
+
+def aspect_sentiment(ranking, vectors, labels, scores, n_aspects=ASPECT_COUNT,
+                     min_similarity=ASPECT_MIN_SIMILARITY):
+    """
+    Per-aspect label counts, shares and mean confidence. `ranking` is a
+    keyphrases.Ranking, `vectors` the ranker's vectors for `ranking.keys`,
+    `labels` / `scores` the predicted label and confidence of every review.
+    """
+    if not ranking.candidates or not ranking.mentions:
+        return []
+    n_reviews = len(ranking.mentions)
+    labels = np.asarray(labels[:n_reviews])
+    scores = np.asarray(scores[:n_reviews], dtype=np.float32)
+
+    aspect_idx = ranking.order[:n_aspects]
+    hits = (ranking.mention_matrix() @ assign_aspects(vectors, aspect_idx, min_similarity)) > 0
+    hits = hits.astype(np.float32)
+
+    classes = np.unique(labels)
+    label_counts = hits.T @ (labels[:, None] == classes[None, :]).astype(np.float32)
+    mentions = hits.sum(axis=0)
+    confidence = hits.T @ scores / np.where(mentions == 0, 1.0, mentions)
+
+    aspects = []
+    for k in np.argsort(-mentions, kind="stable"):
+        if not mentions[k]:
+            continue
+        counts = {str(c): int(n) for c, n in zip(classes, label_counts[k])}
+        aspects.append({
+            "aspect": ranking.candidates[aspect_idx[k]][1],
+            "mentions": int(mentions[k]),
+            "sentiment": counts,
+            "share": {c: round(n / float(mentions[k]), 3) for c, n in counts.items()},
+            "dominant": str(classes[label_counts[k].argmax()]),
+            "mean_confidence": round(float(confidence[k]), 4),
+        })
+    return aspects
@@ -0,0 +1,39 @@
+"""
+Fixed review corpus used by the offline compile report and the benchmarks, so
+numbers from different runs and deployments are comparable.
+"""
+
+REVIEW_CORPUS = [
+    "Battery life is excellent, easily lasts two days with moderate use.",
+    "The camera quality is disappointing in low light and the photos look grainy.",
+    "Delivered on time and the packaging was neat. Works as described.",
+    "Stopped working after a week. Customer support never replied to my emails.",
+    "Decent phone for the price but the speaker is too quiet.",
+    "Absolutely love the display, colours are vivid and the brightness is great outdoors.",
+    "The charger gets very hot and charging is slower than advertised.",
+    "Build quality feels premium and the phone is light in the hand.",
+    "Average product. Nothing special, nothing terrible either.",
+    "Worst purchase ever, the screen cracked on the first drop.",
+    "Sound quality of these earphones is crisp and the bass is punchy.",
+    "Fit is comfortable but the noise cancellation is weak on flights.",
+    "Value for money. Performs well for everyday tasks and light gaming.",
+    "The fabric started fading after two washes, very poor quality.",
+    "Size was perfect and the material feels soft and breathable.",
+    "Heating issue while gaming, the back panel becomes uncomfortable to hold.",
+    "Fast delivery, genuine product, happy with the purchase.",
+    "The software is full of bloatware and ads, really annoying experience.",
+    "Good keyboard with nice tactile feedback, though the backlight is uneven.",
+    "It is okay. The battery could be better but the screen is fine.",
+    "Received a used unit with scratches on the body. Returned it immediately.",
+    "Camera is superb in daylight, portrait mode is impressive.",
+    "The mixer grinder is powerful but extremely noisy.",
+    "Not worth the hype, performance drops after a few months.",
+    "Great laptop for students, boots quickly and the trackpad is smooth.",
+    "Water bottle leaks from the lid, cannot carry it in a bag.",
+    "The watch tracks steps accurately and the strap is comfortable.",
+    "Terrible fit, the shoes run two sizes small.",
+    "Picture quality on this TV is stunning and the remote is easy to use.",
+    "Product is fine but the delivery partner was rude and late.",
+    "Excellent sound, battery lasts all week, totally recommend it.",
+    "The app keeps crashing and the device disconnects from wifi every hour.",
+]
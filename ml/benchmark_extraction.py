@@ -0,0 +1,65 @@
+"""
+Per-page DOM extraction benchmark: per-element WebDriver calls vs one script.
+
+    python benchmark_extraction.py URL [URL ...] [--repeat 5] [--json out.json]
+
+Loads each review page once in a pooled browser, then times both extraction
+modes on the same DOM (median of `repeat` runs). Also reports how many records
+each mode returned and how many of them differ, i.e. where the flat element
+lists had drifted out of alignment with the review cards.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import scrapers
+from waits import wait_for_count, wait_for_ready
+
+
+def timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 1), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with scrapers.browser_pool.checkout() as browser:
+        for url in args.urls:
+            site = "amazon" if "amazon" in url else "flipkart"
+            browser.get(url)
+            wait_for_ready(browser)
+            wait_for_count(browser, scrapers.SITES[site][0])
+            elements_ms, by_elements = timed(lambda: scrapers.extract_page(browser, site, "elements"), args.repeat)
+            script_ms, by_script = timed(lambda: scrapers.extract_page(browser, site, "script"), args.repeat)
+            results[url] = {
+                "elements": {"median_ms": elements_ms, "records": len(by_elements)},
+                "script": {"median_ms": script_ms, "records": len(by_script)},
+                "differing_records": sum(a != b for a, b in zip(by_elements, by_script))
+                + abs(len(by_elements) - len(by_script)),
+            }
+    scrapers.browser_pool.close()
+
+    for url, r in results.items():
+        print(f"\n{url}")
+        for mode in ("elements", "script"):
+            print(f"  {mode:9}{r[mode]['median_ms']:>10} ms{r[mode]['records']:>6} records")
+        print(f"  differing records: {r['differing_records']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
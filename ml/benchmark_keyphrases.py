@@ -0,0 +1,109 @@
+"""
+Keyphrase ranker benchmark: BERT vs TF-IDF vs static phrase table.
+
+    python benchmark_keyphrases.py [--repeat 5] [--top-n 10] [--phrase-table phrase_table] [--json out.json]
+
+Ranks the noun chunks of the bench_corpus.py reviews (as a list of reviews,
+as the service does) with each ranker and reports the median
+latency of `extract` and the overlap@top-n with the BERT ranking. The BERT
+phrase cache is cleared before every run so its numbers reflect cold phrases.
+It also compares the full en_core_web_sm pipeline on the joined text with the
+trimmed noun-chunk pipeline over the per-review texts (time and RSS growth).
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from bench_corpus import REVIEW_CORPUS
+from benchmark_quantization import rss_mb
+from keyphrases import KeyphraseEngine, StaticTableRanker, TfidfRanker, load_noun_chunker
+
+
+def timed(fn, repeat, before=None):
+    times = []
+    result = None
+    for _ in range(repeat + 1):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times[1:]) * 1000, 2), result
+
+
+def overlap(reference, ranked):
+    ref = {p.lower() for p in reference}
+    return round(len(ref & {p.lower() for p in ranked}) / (len(ref) or 1), 3)
+
+
+def bench_spacy(spacy, texts, repeat):
+    results = {}
+    for name, load, run in (
+        ("full", lambda: spacy.load("en_core_web_sm"), lambda nlp: list(nlp(" ".join(texts)).noun_chunks)),
+        ("trimmed", lambda: load_noun_chunker(spacy),
+         lambda nlp: [c for doc in nlp.pipe(texts, batch_size=64) for c in doc.noun_chunks]),
+    ):
+        before = rss_mb()
+        nlp = load()
+        loaded = rss_mb() - before
+        latency, _ = timed(lambda: run(nlp), repeat)
+        results[name] = {"latency_ms": latency, "rss_growth_mb": round(loaded, 1), "pipes": nlp.pipe_names}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--phrase-table", default="phrase_table")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    import spacy
+    import transformers
+
+    from sentiment import get_backend
+
+    spacy_results = bench_spacy(spacy, list(REVIEW_CORPUS), args.repeat)
+    nlp = load_noun_chunker(spacy)
+    reviews = list(REVIEW_CORPUS)
+    tokenizer = transformers.AutoTokenizer.from_pretrained("bert-base-uncased")
+    bert_model = transformers.AutoModel.from_pretrained("bert-base-uncased").eval()
+
+    engines = {
+        "bert": KeyphraseEngine(nlp, tokenizer, bert_model),
+        "tfidf": KeyphraseEngine(nlp, ranker=TfidfRanker(get_backend("tfidf-mlp").vectorizer)),
+    }
+    if os.path.exists(os.path.join(args.phrase_table, "embeddings.npy")):
+        engines["static"] = KeyphraseEngine(nlp, ranker=StaticTableRanker(args.phrase_table))
+    else:
+        print(f"[WARN] No phrase table in {args.phrase_table}; run build_phrase_table.py to include it")
+
+    results = {"candidates": len(engines["bert"].candidates(reviews)), "top_n": args.top_n, "spacy": spacy_results}
+    reference = None
+    for name, engine in engines.items():
+        latency, phrases = timed(lambda: engine.extract(reviews, top_n=args.top_n), args.repeat,
+                                 before=lambda: engine.cache.clear())
+        reference = reference or phrases
+        results[name] = {"latency_ms": latency, "overlap_with_bert": overlap(reference, phrases),
+                         "keyphrases": phrases}
+
+    print(f"{results['candidates']} candidate phrases, top {args.top_n}")
+    print(f"  {'ranker':8}{'latency ms':>12}{'overlap':>10}")
+    for name in engines:
+        r = results[name]
+        print(f"  {name:8}{r['latency_ms']:>12}{r['overlap_with_bert']:>10}   {', '.join(r['keyphrases'][:5])}")
+
+    print("spaCy noun chunks")
+    for name, r in spacy_results.items():
+        print(f"  {name:8}{r['latency_ms']:>12} ms{r['rss_growth_mb']:>10} MB   {', '.join(r['pipes'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
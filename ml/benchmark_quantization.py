@@ -0,0 +1,146 @@
+"""
+fp32 vs dynamic-int8 benchmark for the CPU transformer models.
+
+    python benchmark_quantization.py [--repeat 5] [--corpus-multiplier 4] [--threads N] [--json out.json]
+
+For the BERT encoder (keyphrase embeddings) and the sentiment classifier it
+reports per-pass latency (median of `repeat` runs), throughput in reviews/s,
+RSS growth after loading, serialized weight size, and agreement with fp32
+(label agreement for sentiment, embedding cosine for BERT). All numbers come
+from the fixed corpus in bench_corpus.py so deployments can be compared.
+"""
+import argparse
+import copy
+import io
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+
+from bench_corpus import REVIEW_CORPUS
+from keyphrases import KeyphraseEngine
+from quantization import quantize_dynamic
+from sentiment import predict_sentiments
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux /proc, falling back to peak RSS)."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def weight_mb(model):
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def measure(fn, n_items, repeat):
+    fn()  # warm-up
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {"latency_ms": round(median * 1000, 1), "throughput_per_s": round(n_items / median, 1)}, result
+
+
+def bench_bert(texts, repeat):
+    import transformers
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained("bert-base-uncased")
+    before = rss_mb()
+    fp32 = transformers.AutoModel.from_pretrained("bert-base-uncased").eval()
+    fp32_rss = rss_mb() - before
+    before = rss_mb()
+    int8 = quantize_dynamic(copy.deepcopy(fp32))
+    int8_rss = rss_mb() - before
+
+    fp32_stats, ref = measure(lambda: KeyphraseEngine(None, tokenizer, fp32).embed(texts), len(texts), repeat)
+    int8_stats, new = measure(lambda: KeyphraseEngine(None, tokenizer, int8).embed(texts), len(texts), repeat)
+    cos = (ref * new).sum(axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(new, axis=1))
+    return {
+        "fp32": {**fp32_stats, "rss_growth_mb": round(fp32_rss, 1), "weights_mb": round(weight_mb(fp32), 1)},
+        "int8": {**int8_stats, "rss_growth_mb": round(int8_rss, 1), "weights_mb": round(weight_mb(int8), 1)},
+        "embedding_cosine_mean": round(float(cos.mean()), 4),
+        "embedding_cosine_min": round(float(cos.min()), 4),
+    }
+
+
+def bench_sentiment(texts, repeat):
+    import transformers
+
+    before = rss_mb()
+    fp32 = transformers.pipeline("sentiment-analysis")
+    fp32_rss = rss_mb() - before
+    before = rss_mb()
+    int8 = transformers.pipeline("sentiment-analysis", model=quantize_dynamic(copy.deepcopy(fp32.model)),
+                                 tokenizer=fp32.tokenizer)
+    int8_rss = rss_mb() - before
+
+    fp32_stats, ref = measure(lambda: predict_sentiments(texts, fp32), len(texts), repeat)
+    int8_stats, new = measure(lambda: predict_sentiments(texts, int8), len(texts), repeat)
+    agreement = np.mean([a["label"] == b["label"] for a, b in zip(ref, new)])
+    score_delta = np.mean([abs(a["score"] - b["score"]) for a, b in zip(ref, new)])
+    return {
+        "fp32": {**fp32_stats, "rss_growth_mb": round(fp32_rss, 1), "weights_mb": round(weight_mb(fp32.model), 1)},
+        "int8": {**int8_stats, "rss_growth_mb": round(int8_rss, 1), "weights_mb": round(weight_mb(int8.model), 1)},
+        "label_agreement": round(float(agreement), 4),
+        "mean_abs_score_delta": round(float(score_delta), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus-multiplier", type=int, default=4, help="repeat the corpus to enlarge batches")
+    parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads (0 keeps the default)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    import torch
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    texts = list(REVIEW_CORPUS) * args.corpus_multiplier
+
+    results = {
+        "corpus_size": len(texts),
+        "torch_threads": torch.get_num_threads(),
+        "cpu_count": os.cpu_count(),
+        "bert": bench_bert(texts, args.repeat),
+        "sentiment": bench_sentiment(texts, args.repeat),
+    }
+
+    for model in ("bert", "sentiment"):
+        r = results[model]
+        print(f"\n{model}")
+        print(f"  {'':6}{'latency ms':>12}{'reviews/s':>12}{'RSS +MB':>10}{'weights MB':>12}")
+        for precision in ("fp32", "int8"):
+            p = r[precision]
+            print(f"  {precision:6}{p['latency_ms']:>12}{p['throughput_per_s']:>12}"
+                  f"{p['rss_growth_mb']:>10}{p['weights_mb']:>12}")
+        extras = {k: v for k, v in r.items() if k not in ("fp32", "int8")}
+        print("  " + ", ".join(f"{k}={v}" for k, v in extras.items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
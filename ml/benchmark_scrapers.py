@@ -0,0 +1,91 @@
+"""
+HTTP vs browser scraping benchmark.
+
+    python benchmark_scrapers.py URL [URL ...] [--pages 3] [--json out.json]
+
+For every product URL, scrapes the first `pages` review pages with the HTTP
+backend and with a pooled browser, one page at a time, and reports per-page
+latency, reviews found, whether HTTP needed the browser fallback, and memory:
+RSS growth of this process plus, for the browser, the RSS of its Chrome
+processes (psutil, if installed).
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmark_quantization import rss_mb
+from pagination import review_page_urls
+
+
+def chrome_rss_mb():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    children = psutil.Process().children(recursive=True)
+    return round(sum(p.memory_info().rss for p in children if p.is_running()) / (1024 * 1024), 1)
+
+
+def run_backend(name, fetch, urls):
+    before = rss_mb()
+    times, reviews, problems = [], 0, []
+    for i, url in enumerate(urls):
+        start = time.perf_counter()
+        records, problem = fetch(url, i == 0)
+        times.append(time.perf_counter() - start)
+        reviews += len(records)
+        if problem:
+            problems.append(problem)
+    result = {
+        "pages": len(urls),
+        "reviews": reviews,
+        "median_page_ms": round(statistics.median(times) * 1000, 1),
+        "total_s": round(sum(times), 2),
+        "rss_growth_mb": round(rss_mb() - before, 1),
+        "problems": problems,
+    }
+    if name == "browser":
+        result["chrome_rss_mb"] = chrome_rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    import http_scraper
+    import scrapers
+
+    results = {}
+    for product_url in args.urls:
+        site = "amazon" if "amazon" in product_url else "flipkart"
+        urls = review_page_urls(product_url, args.pages) or [product_url]
+        results[product_url] = {
+            "http": run_backend("http", lambda u, first: http_scraper.scrape_page(site, u, first), urls),
+            "browser": run_backend("browser", lambda u, first: (scrapers.scrape_page(site, u), None), urls),
+        }
+    scrapers.browser_pool.close()
+
+    for product_url, r in results.items():
+        print(f"\n{product_url}")
+        print(f"  {'backend':9}{'pages':>6}{'reviews':>9}{'page ms':>10}{'total s':>9}{'RSS +MB':>9}")
+        for name in ("http", "browser"):
+            b = r[name]
+            print(f"  {name:9}{b['pages']:>6}{b['reviews']:>9}{b['median_page_ms']:>10}{b['total_s']:>9}"
+                  f"{b['rss_growth_mb']:>9}")
+        if r["browser"].get("chrome_rss_mb") is not None:
+            print(f"  chrome processes: {r['browser']['chrome_rss_mb']} MB")
+        if r["http"]["problems"]:
+            print(f"  http fallbacks needed: {', '.join(r['http']['problems'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
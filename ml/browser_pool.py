@@ -0,0 +1,124 @@
+"""
+Bounded pool of warm Chrome instances shared by the scrapers.
+
+Browsers are created lazily up to `size`, handed out with `checkout()`, and
+returned to the pool afterwards. A browser is recycled (quit and replaced on
+the next checkout) when it fails its health check, when the caller raised
+while holding it, or after it has loaded `max_pages` pages.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import browser_crashes, browser_launches, span
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+BROWSER_CHECKOUT_TIMEOUT = float(os.getenv("BROWSER_CHECKOUT_TIMEOUT", "60"))
+
+
+class BrowserPool:
+    def __init__(self, factory, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES,
+                 checkout_timeout=BROWSER_CHECKOUT_TIMEOUT):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # ------------------------------------------------------------------ #
+    def note_page(self, browser, count=1):
+        """Record page loads on a checked-out browser so it can be recycled after max_pages."""
+        with self._lock:
+            self._pages[id(browser)] = self._pages.get(id(browser), 0) + count
+
+    def _healthy(self, browser):
+        try:
+            browser.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"[WARN] Pooled browser failed health check: {e}")
+            browser_crashes.inc()
+            return False
+
+    def _discard(self, browser):
+        with self._lock:
+            self._pages.pop(id(browser), None)
+        try:
+            browser.quit()
+        except Exception:
+            pass
+
+    def _acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser available within {timeout:.0f}s")
+        try:
+            while True:
+                try:
+                    browser = self._idle.get_nowait()
+                except queue.Empty:
+                    print("[INFO] Starting new pooled browser...")
+                    with span("browser_launch"):
+                        browser = self.factory()
+                    browser_launches.inc()
+                    with self._lock:
+                        self._pages[id(browser)] = 0
+                    return browser
+                if self._healthy(browser):
+                    return browser
+                self._discard(browser)
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No healthy browser available within {timeout:.0f}s")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, browser, broken=False):
+        try:
+            with self._lock:
+                worn_out = self._pages.get(id(browser), 0) >= self.max_pages
+            if broken or worn_out or self._closed:
+                if worn_out:
+                    print("[INFO] Recycling pooled browser after page limit")
+                self._discard(browser)
+            else:
+                self._idle.put(browser)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a browser for the duration of the `with` block."""
+        browser = self._acquire(self.checkout_timeout if timeout is None else timeout)
+        broken = False
+        try:
+            yield browser
+        except Exception:
+            broken = not self._healthy(browser)
+            raise
+        finally:
+            # also runs on GeneratorExit when a streaming scraper is closed early
+            self._release(browser, broken=broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def create_pool(factory, **kwargs):
+    """Build a pool whose idle browsers are quit when the process exits."""
+    pool = BrowserPool(factory, **kwargs)
+    atexit.register(pool.close)
+    return pool
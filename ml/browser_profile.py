@@ -0,0 +1,123 @@
+"""
+Lean Chrome profile for scraping review text.
+
+With SCRAPE_BLOCK_RESOURCES=1 (the default) images are disabled through
+Chrome prefs, and images, media, fonts and known ad / analytics hosts are
+blocked through the DevTools protocol (`Network.setBlockedURLs`). Stylesheets
+still load: the extraction reads `innerText`, which depends on CSS visibility.
+
+Every scrape records page-load time from the Performance API and bytes
+transferred from Chrome's performance log: the `encodedDataLength` of each
+`Network.loadingFinished` event, which unlike the Performance API's
+`transferSize` also counts cross-origin resources (CDN images, fonts,
+trackers) served without Timing-Allow-Origin. `load_stats` aggregates them.
+"""
+import json
+import os
+import threading
+
+SCRAPE_BLOCK_RESOURCES = os.getenv("SCRAPE_BLOCK_RESOURCES", "1") == "1"
+
+BLOCKED_EXTENSIONS = (
+    "jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "m3u8", "mp3",
+)
+BLOCKED_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "google-analytics.com", "googletagmanager.com",
+    "adservice.google.com", "facebook.net", "connect.facebook.net", "amazon-adsystem.com",
+    "fls-na.amazon.com", "fls-eu.amazon.com", "unagi.amazon.com", "scorecardresearch.com",
+    "criteo.com", "criteo.net", "hotjar.com", "clarity.ms",
+) + tuple(h.strip() for h in os.getenv("SCRAPE_BLOCKED_HOSTS", "").split(",") if h.strip())
+
+BLOCKED_URL_PATTERNS = [f"*.{ext}*" for ext in BLOCKED_EXTENSIONS] + [f"*{host}*" for host in BLOCKED_HOSTS]
+
+CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+}
+
+PAGE_LOAD_JS = """
+const nav = performance.getEntriesByType("navigation")[0];
+return nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime : null;
+"""
+
+
+def apply_prefs(options, block=SCRAPE_BLOCK_RESOURCES):
+    # network events for byte counts, with blocking on or off so the two can be compared
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if block:
+        options.add_experimental_option("prefs", CHROME_PREFS)
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    return options
+
+
+def install_blocking(browser, block=SCRAPE_BLOCK_RESOURCES):
+    """Block heavy resources and trackers for every later navigation of `browser`."""
+    if not block:
+        return browser
+    try:
+        browser.execute_cdp_cmd("Network.enable", {})
+        browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"[WARN] Could not enable request blocking: {e}")
+    return browser
+
+
+def network_bytes(browser):
+    """(bytes, requests) of the requests finished since the last call, from the performance log."""
+    total = requests = 0
+    for entry in browser.get_log("performance"):
+        message = json.loads(entry["message"]).get("message", {})
+        if message.get("method") == "Network.loadingFinished":
+            total += message.get("params", {}).get("encodedDataLength", 0)
+            requests += 1
+    return int(total), requests
+
+
+class PageLoadStats:
+    """Running totals of bytes transferred and page-load time across scrapes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.bytes = 0
+        self.load_ms = 0.0
+
+    def begin(self, browser):
+        """Drop network events logged before the next navigation (e.g. by an earlier use of a pooled browser)."""
+        try:
+            browser.get_log("performance")
+        except Exception:
+            pass
+
+    def measure(self, browser, label=""):
+        """Read the bytes and load time since `begin` / the last measure, log them and add them to the totals."""
+        try:
+            total, requests = network_bytes(browser)
+            load_ms = float(browser.execute_script(PAGE_LOAD_JS) or 0.0)
+        except Exception as e:
+            print(f"[WARN] Could not read page-load stats: {e}")
+            return None
+        with self._lock:
+            self.pages += 1
+            self.bytes += total
+            self.load_ms += load_ms
+        print(f"[TIMING] {label} page_load={load_ms:.0f}ms transferred={total / 1024:.0f}KB "
+              f"requests={requests} blocking={'on' if SCRAPE_BLOCK_RESOURCES else 'off'}")
+        return {"bytes": total, "load_ms": round(load_ms, 1), "requests": requests}
+
+    def summary(self):
+        with self._lock:
+            pages = self.pages or 1
+            return {
+                "blocking": SCRAPE_BLOCK_RESOURCES,
+                "pages": self.pages,
+                "bytes_total": self.bytes,
+                "avg_kb_per_page": round(self.bytes / pages / 1024, 1),
+                "avg_load_ms": round(self.load_ms / pages, 1),
+            }
+
+
+load_stats = PageLoadStats()
@@ -0,0 +1,66 @@
+"""
+Build the static phrase-embedding table used by KEYPHRASE_RANKER=static.
+
+    python build_phrase_table.py reviews.txt [--out phrase_table] [--min-count 2] [--max-phrases 50000]
+
+Reads one review per line, collects the normalized noun chunks (and their
+single words, so unseen phrases can be composed at query time) that occur at
+least `min-count` times, embeds them once with bert-base-uncased and writes
+
+    phrases.json      normalized phrases, row order of the matrix
+    embeddings.npy    float16, L2-normalized, one row per phrase
+"""
+import argparse
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from keyphrases import KeyphraseEngine, load_noun_chunker, normalize_phrase
+
+
+def collect_phrases(nlp, lines, min_count, max_phrases):
+    counts = Counter()
+    for doc in nlp.pipe(lines, batch_size=256):
+        for chunk in doc.noun_chunks:
+            key = normalize_phrase(chunk.text)
+            if key:
+                counts[key] += 1
+                if " " in key:
+                    counts.update(key.split())
+    return [phrase for phrase, n in counts.most_common(max_phrases) if n >= min_count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="text file with one review per line")
+    parser.add_argument("--out", default="phrase_table")
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--max-phrases", type=int, default=50000)
+    args = parser.parse_args()
+
+    import spacy
+    import transformers
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    nlp = load_noun_chunker(spacy)
+    phrases = collect_phrases(nlp, lines, args.min_count, args.max_phrases)
+    print(f"[INFO] {len(phrases)} phrases from {len(lines)} reviews")
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained("bert-base-uncased")
+    bert_model = transformers.AutoModel.from_pretrained("bert-base-uncased").eval()
+    embeddings = KeyphraseEngine(nlp, tokenizer, bert_model).embed(phrases)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = (embeddings / np.where(norms == 0, 1.0, norms)).astype(np.float16)
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "phrases.json"), "w", encoding="utf-8") as f:
+        json.dump(phrases, f)
+    np.save(os.path.join(args.out, "embeddings.npy"), embeddings)
+    print(f"[INFO] Phrase table written to {args.out} ({embeddings.nbytes / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Canonical product keys for cache lookups and job de-duplication.
+
+The same product is reachable through many URLs (tracking parameters, `ref=`
+path segments, /dp/ vs /gp/product/, mobile hosts, review-listing pages...).
+`product_key` reduces them to a stable identifier:
+
+    amazon.in:B0C7XYZ123        ASIN, scoped to the marketplace domain
+    flipkart:MOBGTAGPTB3VS24W   Flipkart pid (falls back to the itm listing id)
+
+URLs that match neither pattern fall back to scheme-less host + path.
+"""
+import re
+from urllib.parse import parse_qs, urlsplit
+
+_ASIN = r"([A-Z0-9]{10})"
+_AMAZON_PATH_PATTERNS = [
+    re.compile(r"/dp/" + _ASIN + r"(?:[/?]|$)", re.I),
+    re.compile(r"/gp/product/" + _ASIN + r"(?:[/?]|$)", re.I),
+    re.compile(r"/gp/aw/d/" + _ASIN + r"(?:[/?]|$)", re.I),
+    re.compile(r"/product-reviews/" + _ASIN + r"(?:[/?]|$)", re.I),
+    re.compile(r"/exec/obidos/(?:tg/detail/-/|ASIN/)" + _ASIN + r"(?:[/?]|$)", re.I),
+    re.compile(r"/o/(?:ASIN/)?" + _ASIN + r"(?:[/?]|$)", re.I),
+]
+_FLIPKART_ITEM = re.compile(r"/(?:p|product-reviews)/(itm[0-9a-z]+)", re.I)
+
+
+def normalized_host(parts):
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "dl.", "smile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def _amazon_key(parts, host):
+    for pattern in _AMAZON_PATH_PATTERNS:
+        match = pattern.search(parts.path)
+        if match:
+            return f"{host}:{match.group(1).upper()}"
+    asin = parse_qs(parts.query).get("asin")
+    if asin and re.fullmatch(_ASIN, asin[0], re.I):
+        return f"{host}:{asin[0].upper()}"
+    return None
+
+
+def _flipkart_key(parts):
+    pid = parse_qs(parts.query).get("pid")
+    if pid and pid[0].strip():
+        return f"flipkart:{pid[0].strip().upper()}"
+    match = _FLIPKART_ITEM.search(parts.path)
+    if match:
+        return f"flipkart:{match.group(1).lower()}"
+    return None
+
+
+def product_key(url):
+    """Stable cache / dedupe key for a product URL."""
+    url = (url or "").strip()
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = normalized_host(parts)
+    key = None
+    if host.startswith("amazon."):
+        key = _amazon_key(parts, host)
+    elif host == "flipkart.com":
+        key = _flipkart_key(parts)
+    if key:
+        return key
+    return host + parts.path.rstrip("/")
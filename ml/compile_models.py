@@ -0,0 +1,100 @@
+"""
+Offline compile step for the ML service's models.
+
+    python compile_models.py --out model_bundle [--quantize] [--no-report]
+
+Exports the BERT encoder and sentiment classifier as TorchScript (optionally
+with dynamic int8 Linear layers) and the TF-IDF vocabulary and MLP weights as
+raw arrays, then compares the bundle with the current models on the fixed
+review corpus (label agreement, embedding cosine, latency) and writes
+report.json next to the bundle. Point MODEL_BUNDLE_DIR at the output to serve it.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+import model_bundle
+from bench_corpus import REVIEW_CORPUS
+from keyphrases import KeyphraseEngine
+from sentiment import TfidfMlpBackend, predict_sentiments
+
+
+def _timed(fn, repeat=3):
+    """Best-of-`repeat` wall time of fn() in ms, plus its last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2), result
+
+
+def compare(out_dir):
+    import transformers
+
+    texts = list(REVIEW_CORPUS)
+    report = {}
+
+    # BERT encoder: embeddings should be near-identical
+    tokenizer = transformers.AutoTokenizer.from_pretrained("bert-base-uncased")
+    bert = transformers.AutoModel.from_pretrained("bert-base-uncased").eval()
+    b_tokenizer, b_bert = model_bundle.load_bert(out_dir)
+    ref_ms, ref = _timed(lambda: KeyphraseEngine(None, tokenizer, bert).embed(texts))
+    new_ms, new = _timed(lambda: KeyphraseEngine(None, b_tokenizer, b_bert).embed(texts))
+    cos = (ref * new).sum(axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(new, axis=1))
+    report["bert"] = {"reference_ms": ref_ms, "bundle_ms": new_ms,
+                      "mean_cosine": round(float(cos.mean()), 5), "min_cosine": round(float(cos.min()), 5)}
+
+    # sentiment classifier: labels should agree
+    pipe = transformers.pipeline("sentiment-analysis")
+    b_pipe = model_bundle.load_sentiment_pipeline(out_dir)
+    ref_ms, ref = _timed(lambda: predict_sentiments(texts, pipe))
+    new_ms, new = _timed(lambda: predict_sentiments(texts, b_pipe))
+    agree = np.mean([a["label"] == b["label"] for a, b in zip(ref, new)])
+    report["sentiment"] = {"reference_ms": ref_ms, "bundle_ms": new_ms, "label_agreement": round(float(agree), 4)}
+
+    # TF-IDF MLP: pickles vs memory-mapped arrays
+    load_ref_ms, ref_backend = _timed(TfidfMlpBackend.from_files, repeat=1)
+    load_new_ms, new_backend = _timed(lambda: model_bundle.load_tfidf_backend(out_dir), repeat=1)
+    ref_ms, ref = _timed(lambda: ref_backend.predict(texts))
+    new_ms, new = _timed(lambda: new_backend.predict(texts))
+    agree = np.mean([a["label"] == b["label"] for a, b in zip(ref, new)])
+    report["tfidf_mlp"] = {"reference_load_ms": load_ref_ms, "bundle_load_ms": load_new_ms,
+                           "reference_ms": ref_ms, "bundle_ms": new_ms, "label_agreement": round(float(agree), 4)}
+
+    report["corpus_size"] = len(texts)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="model_bundle", help="output directory")
+    parser.add_argument("--quantize", action="store_true", help="dynamic int8 quantization of Linear layers")
+    parser.add_argument("--no-report", action="store_true", help="skip the comparison report")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    print(f"[INFO] Exporting transformer models to {args.out} (quantize={args.quantize})...")
+    models = model_bundle.export_transformers(args.out, quantize=args.quantize)
+    print("[INFO] Exporting TF-IDF vocabulary and MLP weights...")
+    model_bundle.export_tfidf(args.out, TfidfMlpBackend.from_files())
+
+    manifest = {"created": datetime.utcnow().isoformat() + "Z", "quantized": args.quantize, "models": models}
+    with open(os.path.join(args.out, model_bundle.MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[INFO] Bundle written to {args.out} ✅")
+
+    if not args.no_report:
+        print("[INFO] Comparing bundle against current models...")
+        report = compare(args.out)
+        with open(os.path.join(args.out, "report.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Persistent store of review embeddings across products.
+
+Layout under EMBEDDING_STORE_DIR:
+
+    vectors.f16    float16 rows, L2-normalized, appended in place and read
+                   through a NumPy memmap
+    meta.sqlite3   one row per vector: product key, review hash, product URL
+                   and the review text; (product_key, review_hash) is unique
+
+Reviews are keyed by canonical product key and a hash of their normalized
+text, so re-analyzing a product only embeds reviews that are new. Similarity
+search is brute force (chunked float16 -> float32 mat-vec + argpartition);
+with faiss installed, collections above EMBEDDING_ANN_THRESHOLD rows use an
+HNSW inner-product index instead.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "768"))
+EMBEDDING_ANN_THRESHOLD = int(os.getenv("EMBEDDING_ANN_THRESHOLD", "200000"))
+SEARCH_CHUNK_ROWS = 65536
+REVIEW_TEXT_LIMIT = 1000
+
+
+def review_hash(text):
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _top_k(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+class EmbeddingStore:
+    def __init__(self, path=EMBEDDING_STORE_DIR, dim=EMBEDDING_DIM):
+        self.path = path
+        self.dim = dim
+        self.vectors_path = os.path.join(path, "vectors.f16")
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(path, "meta.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " row INTEGER PRIMARY KEY, product_key TEXT NOT NULL, review_hash TEXT NOT NULL,"
+            " product_url TEXT, review_text TEXT, UNIQUE(product_key, review_hash))"
+        )
+        self._db.commit()
+        rows = self._db.execute("SELECT product_key FROM reviews ORDER BY row").fetchall()
+        self._product_keys = sorted({key for (key,) in rows})
+        self._product_ids = {key: i for i, key in enumerate(self._product_keys)}
+        self._row_products = np.array([self._product_ids[key] for (key,) in rows], dtype=np.int32)
+        self._truncate_vectors(len(rows))
+        self._memmap = None
+        self._centroids = None
+        self._ann = None
+
+    # ------------------------------------------------------------------ #
+    def _truncate_vectors(self, rows):
+        """Drop vectors written without metadata (e.g. a crash between the two writes)."""
+        expected = rows * self.dim * 2
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    def __len__(self):
+        return len(self._row_products)
+
+    def vectors(self):
+        """Memory-mapped (rows, dim) float16 view of every stored vector."""
+        with self._lock:
+            if not len(self):
+                return np.zeros((0, self.dim), dtype=np.float16)
+            if self._memmap is None or len(self._memmap) != len(self):
+                self._memmap = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(len(self), self.dim))
+            return self._memmap
+
+    def lookup(self, product_key, hashes):
+        """review hash -> row for the hashes already stored for `product_key`."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                found.update(self._db.execute(
+                    f"SELECT review_hash, row FROM reviews WHERE product_key = ? "
+                    f"AND review_hash IN ({','.join('?' * len(chunk))})",
+                    [product_key, *chunk],
+                ).fetchall())
+        return found
+
+    def add(self, product_key, texts, vectors, product_url=None):
+        """Append embeddings for `texts` of one product; already stored reviews are skipped."""
+        hashes = [review_hash(t) for t in texts]
+        vectors = _normalize(vectors).astype(np.float16)
+        with self._lock:
+            existing = self.lookup(product_key, hashes)
+            keep, seen = [], set(existing)
+            for i, h in enumerate(hashes):
+                if h not in seen:
+                    keep.append(i)
+                    seen.add(h)
+            if not keep:
+                return 0
+            start = len(self)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors[keep]).tobytes())
+            self._db.executemany(
+                "INSERT INTO reviews (row, product_key, review_hash, product_url, review_text) VALUES (?, ?, ?, ?, ?)",
+                [(start + n, product_key, hashes[i], product_url, texts[i][:REVIEW_TEXT_LIMIT])
+                 for n, i in enumerate(keep)],
+            )
+            self._db.commit()
+            if product_key not in self._product_ids:
+                self._product_ids[product_key] = len(self._product_keys)
+                self._product_keys.append(product_key)
+            new_ids = np.full(len(keep), self._product_ids[product_key], dtype=np.int32)
+            self._row_products = np.concatenate([self._row_products, new_ids])
+            self._centroids = None
+            return len(keep)
+
+    def get_or_embed(self, product_key, texts, embed, product_url=None):
+        """(len(texts), dim) embeddings, calling `embed` only for reviews not stored yet."""
+        hashes = [review_hash(t) for t in texts]
+        rows = self.lookup(product_key, hashes)
+        missing = [i for i, h in enumerate(hashes) if h not in rows]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        if missing:
+            fresh = _normalize(embed([texts[i] for i in missing]))
+            out[missing] = fresh
+            self.add(product_key, [texts[i] for i in missing], fresh, product_url)
+        stored = [i for i, h in enumerate(hashes) if h in rows]
+        if stored:
+            out[stored] = self.vectors()[[rows[hashes[i]] for i in stored]]
+        return out, len(missing)
+
+    # ------------------------------------------------------------------ #
+    def _brute_force(self, query, k, exclude_product=None):
+        vectors = self.vectors()
+        best_scores, best_rows = np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        for start in range(0, len(vectors), SEARCH_CHUNK_ROWS):
+            scores = vectors[start:start + SEARCH_CHUNK_ROWS].astype(np.float32) @ query
+            if exclude_product is not None:
+                scores[self._row_products[start:start + len(scores)] == exclude_product] = -np.inf
+            top = _top_k(scores, k)
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+        order = _top_k(best_scores, k)
+        # with fewer than k other rows, excluded (-inf) rows would fill the result
+        order = order[np.isfinite(best_scores[order])]
+        return best_rows[order], best_scores[order]
+
+    def _ann_index(self):
+        """faiss HNSW index over the current vectors, or None when not worth it / not installed."""
+        if len(self) < EMBEDDING_ANN_THRESHOLD:
+            return None
+        try:
+            import faiss
+        except ImportError:
+            return None
+        with self._lock:
+            if self._ann is None or self._ann.ntotal < len(self) * 0.9:
+                index = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT)
+                for start in range(0, len(self), SEARCH_CHUNK_ROWS):
+                    index.add(np.asarray(self.vectors()[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32))
+                self._ann = index
+            return self._ann
+
+    def similar_reviews(self, query, k=10, exclude_product_key=None):
+        """Top-k stored reviews by cosine with the `query` embedding."""
+        if not len(self):
+            return []
+        query = _normalize(query).ravel()
+        exclude = self._product_ids.get(exclude_product_key)
+        index = self._ann_index()
+        if index is not None:
+            # over-fetch so excluded rows do not leave the result short
+            scores, rows = index.search(query[None, :], k * 4 if exclude is not None else k)
+            pairs = [(r, s) for r, s in zip(rows[0], scores[0])
+                     if r >= 0 and (exclude is None or self._row_products[r] != exclude)][:k]
+            rows, scores = [p[0] for p in pairs], [p[1] for p in pairs]
+        else:
+            rows, scores = self._brute_force(query, k, exclude)
+        return self._describe(rows, scores)
+
+    def _describe(self, rows, scores):
+        rows = [int(r) for r in rows]
+        if not rows:
+            return []
+        with self._lock:
+            meta = {row: (key, url, text) for row, key, url, text in self._db.execute(
+                f"SELECT row, product_key, product_url, review_text FROM reviews WHERE row IN ({','.join('?' * len(rows))})",
+                rows,
+            )}
+        return [{"product_key": meta[r][0], "product_url": meta[r][1], "review_text": meta[r][2],
+                 "similarity": round(float(s), 4)} for r, s in zip(rows, scores)]
+
+    def centroids(self):
+        """(products, dim) normalized mean embedding of each product's reviews."""
+        with self._lock:
+            if self._centroids is None:
+                sums = np.zeros((len(self._product_keys), self.dim), dtype=np.float32)
+                vectors = self.vectors()
+                for start in range(0, len(vectors), SEARCH_CHUNK_ROWS):
+                    np.add.at(sums, self._row_products[start:start + SEARCH_CHUNK_ROWS],
+                              vectors[start:start + SEARCH_CHUNK_ROWS].astype(np.float32))
+                self._centroids = _normalize(sums)
+            return self._centroids
+
+    def similar_products(self, product_key, k=5):
+        """Top-k other products by cosine between review centroids."""
+        product = self._product_ids.get(product_key)
+        if product is None:
+            return []
+        centroids = self.centroids()
+        scores = centroids @ centroids[product]
+        scores[product] = -np.inf
+        top = [i for i in _top_k(scores, k) if np.isfinite(scores[i])]
+        counts = np.bincount(self._row_products, minlength=len(self._product_keys))
+        return [{"product_key": self._product_keys[i], "reviews": int(counts[i]),
+                 "similarity": round(float(scores[i]), 4)} for i in top]
+
+    def product_centroid(self, product_key):
+        product = self._product_ids.get(product_key)
+        return None if product is None else self.centroids()[product]
@@ -11,25 +11,22 @@ import torch.nn as nn
 import joblib
 import pandas as pd
 import spacy
-import numpy as np
 from statistics import mode
-from sklearn.metrics.pairwise import cosine_similarity
 from transformers import AutoTokenizer, AutoModel
 from dotenv import load_dotenv
-import requests
+from keyphrases import KeyphraseEngine, load_noun_chunker
+from summarizer import ExtractiveSummarizer
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from time import sleep
+from waits import StepTimer, wait_for_count, wait_for_ready, wait_for_stale
 
 # ---------------------------
 # Load environment variables
 # ---------------------------
 load_dotenv()
-API_TOKEN = os.getenv("HF_API_TOKEN")
-API_URL = os.getenv("API_URL")
 BACKEND_API_URL = os.getenv("BACKEND_API_URL")
 
 # ---------------------------
@@ -42,74 +39,29 @@ warnings.filterwarnings("ignore", category=ResourceWarning)
 # ---------------------------
 # NLP Setup
 # ---------------------------
-nlp = spacy.load("en_core_web_sm")
+nlp = load_noun_chunker(spacy)
 tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
 bert_model = AutoModel.from_pretrained("bert-base-uncased")
+keyphrase_engine = KeyphraseEngine(nlp, tokenizer, bert_model)
 
-headers = {"Authorization": f"Bearer {API_TOKEN}"}
+summarizer = ExtractiveSummarizer()
 
 # ---------------------------
 # Helper Functions
 # ---------------------------
 
 def generate_review_summary(reviews):
-    """Generate a summary for a list of reviews using Hugging Face API."""
+    """Extractive summary of a list of reviews, computed locally."""
     try:
-        combined_reviews = " ".join(reviews)
-        review_word_count = len(combined_reviews.split())
-        max_length = min(150, review_word_count // 2)
-        min_length = max(40, max_length // 2)
-
-        if len(combined_reviews.split()) > 1024:
-            combined_reviews = " ".join(combined_reviews.split()[:1024])
-
-        payload = {
-            "inputs": combined_reviews,
-            "parameters": {
-                "min_length": min_length,
-                "max_length": max_length,
-                "do_sample": False,
-            },
-        }
-
-        response = requests.post(API_URL, headers=headers, json=payload)
-
-        if response.status_code == 200:
-            return response.json()[0]["summary_text"]
-        else:
-            return "Unable to create summary"
-
+        return summarizer.summarize(reviews)
     except Exception as e:
         print(f"Error generating summary: {str(e)}")
         return "Unable to create summary"
 
 
-def extract_noun_phrases(text):
-    """Extract noun phrases from text using spaCy."""
-    doc = nlp(text)
-    return [chunk.text for chunk in doc.noun_chunks]
-
-
-def get_bert_embedding(text):
-    """Generate BERT embedding for a given text."""
-    inputs = tokenizer(
-        text, return_tensors="pt", padding=True, truncation=True, max_length=512
-    )
-    with torch.no_grad():
-        outputs = bert_model(**inputs)
-    return outputs.last_hidden_state.mean(dim=1).squeeze().numpy()
-
-
 def extract_keyphrases(text, top_n=5):
     """Extract top N keyphrases from text using cosine similarity with BERT embeddings."""
-    noun_phrases = extract_noun_phrases(text)
-    if not noun_phrases:
-        return []
-    doc_embedding = get_bert_embedding(text)
-    phrase_embeddings = [get_bert_embedding(phrase) for phrase in noun_phrases]
-    similarities = cosine_similarity([doc_embedding], phrase_embeddings)[0]
-    sorted_indices = np.argsort(similarities)[::-1]
-    return [noun_phrases[i] for i in sorted_indices[:top_n]]
+    return keyphrase_engine.extract(text, top_n=top_n)
 
 
 # ---------------------------
@@ -166,8 +118,11 @@ def setup_browser():
 def get_reviews_ratings(browser, url):
     """Scrape reviews, ratings, and titles from Flipkart product page."""
     reviews = {"review_text": [], "rating": [], "review_title": []}
+    review_body = (By.CLASS_NAME, "ZmyHeo")
+    timer = StepTimer("flipkart")
     browser.get(url)
-    sleep(3)
+    with timer.step("page_load", replaced_sleep=3):
+        wait_for_ready(browser)
 
     try:
         wait = WebDriverWait(browser, 20)
@@ -180,17 +135,20 @@ def get_reviews_ratings(browser, url):
                 )
             )
             all_reviews_button.click()
-            sleep(3)
+            with timer.step("all_reviews", replaced_sleep=3):
+                wait_for_count(browser, review_body)
         except:
             all_reviews_link = wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "div.col.pPAw9M a"))
             )
             review_url = all_reviews_link.get_attribute("href")
             browser.get(review_url)
-            sleep(3)
+            with timer.step("all_reviews", replaced_sleep=3):
+                wait_for_ready(browser)
+                wait_for_count(browser, review_body)
 
         for _ in range(2):
-            review_elements = browser.find_elements(By.CLASS_NAME, "ZmyHeo")
+            review_elements = browser.find_elements(*review_body)
             for review in review_elements:
                 try:
                     review_text = review.find_element(By.CSS_SELECTOR, "div div").text.strip()
@@ -217,15 +175,21 @@ def get_reviews_ratings(browser, url):
                     )
                 )
                 browser.execute_script("arguments[0].scrollIntoView();", next_button)
-                sleep(2)
+                with timer.step("scroll_to_next", replaced_sleep=2):
+                    wait.until(EC.element_to_be_clickable(next_button))
                 next_button.click()
-                sleep(3)
+                with timer.step("next_page", replaced_sleep=3):
+                    if review_elements:
+                        wait_for_stale(browser, review_elements[0])
+                    wait_for_count(browser, review_body)
             except:
                 break
 
     except Exception as e:
         print(f"Scraping stopped: {e}")
 
+    timer.report()
+
     # Trim lists to the same length
     min_length = min(len(reviews["review_text"]), len(reviews["rating"]), len(reviews["review_title"]))
     for key in reviews:
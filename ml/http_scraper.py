@@ -0,0 +1,94 @@
+"""
+HTTP + HTML-parser scraping of review pages.
+
+Review listings on Amazon and Flipkart are largely server-rendered, so a page
+is fetched with the pooled `requests` session and parsed with selectolax
+(lexbor), using the same selectors as the Selenium scrapers. `scrape_page`
+reports why a page could not be used (block / captcha, JS-only shell, HTTP
+error) so the caller can fall back to a browser for that page only.
+
+SCRAPER_BACKEND picks the path: "auto" (HTTP, browser fallback), "http" or
+"browser".
+"""
+import os
+
+from selectolax.lexbor import LexborHTMLParser
+
+from metrics import span
+from records import clean_title, page_records, parse_rating
+from redirects import http_session
+
+SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "auto")
+HTTP_SCRAPE_TIMEOUT = float(os.getenv("HTTP_SCRAPE_TIMEOUT", "10"))
+
+BLOCK_STATUSES = (403, 429, 503)
+BLOCK_MARKERS = (
+    "/errors/validateCaptcha",
+    "Enter the characters you see below",
+    "api-services-support@amazon.com",
+    "Are you a human?",
+    "g-recaptcha",
+)
+JS_ONLY_MARKERS = ("enable JavaScript", "enable javascript", "Please turn on JavaScript")
+
+HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+def _text(node):
+    # collapse source-formatting whitespace, as the browser's innerText does
+    return " ".join(node.text(separator=" ").split())
+
+
+def parse_amazon(tree):
+    """Column lists of review text, rating and title from an Amazon review page."""
+    return {
+        "review_text": [_text(n) for n in tree.css('span[data-hook="review-body"]')],
+        "rating": [parse_rating(n.text()) for n in tree.css(".review-rating")],
+        "review_title": [clean_title(_text(n)) for n in tree.css('a[data-hook="review-title"]')],
+    }
+
+
+def parse_flipkart(tree):
+    """Column lists of review text, rating and title from a Flipkart review page."""
+    return {
+        "review_text": [_text(n) for n in tree.css(".ZmyHeo")],
+        "rating": [parse_rating(_text(n)) for n in tree.css(".XQDdHH")],
+        "review_title": [_text(n) for n in tree.css("p.z9E0IG")],
+    }
+
+
+PARSERS = {"amazon": parse_amazon, "flipkart": parse_flipkart}
+
+
+def classify(status, html, found_reviews):
+    """None if the page is usable, otherwise why it needs a browser."""
+    if status in BLOCK_STATUSES or any(marker in html for marker in BLOCK_MARKERS):
+        return "blocked"
+    if status >= 400:
+        return f"http-{status}"
+    if not found_reviews and any(marker in html for marker in JS_ONLY_MARKERS):
+        return "js-only"
+    return None
+
+
+def scrape_page(site, url, expect_reviews=False):
+    """
+    Fetch and parse one review page. Returns (records, problem); `problem` is
+    None when the records can be trusted. With `expect_reviews` an empty page
+    counts as JS-only, since the first listing page always has reviews.
+    """
+    try:
+        with span("http_page"):
+            response = http_session.get(url, headers=HEADERS, timeout=HTTP_SCRAPE_TIMEOUT)
+    except Exception as e:
+        return [], f"request-failed: {e}"
+    html = response.text
+    with span("html_parse"):
+        records = page_records(PARSERS[site](LexborHTMLParser(html)))
+    problem = classify(response.status_code, html, bool(records))
+    if problem is None and expect_reviews and not records:
+        problem = "js-only"
+    return records, problem
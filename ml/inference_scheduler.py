@@ -0,0 +1,166 @@
+"""
+Cross-request micro-batching for model inference.
+
+Requests submit chunks of work (texts to embed or classify) tagged with a
+kind. A single dedicated inference thread takes the oldest chunk, gathers
+more queued chunks of the same kind until `max_batch` items are collected or
+`max_wait_ms` has passed, runs them through the kind's handler in one call,
+and resolves each chunk's future with its slice of the results. Concurrent
+/scrape requests therefore share forward passes instead of contending for
+the same cores. Submissions larger than `max_batch` are fed in one slice at
+a time, so a bulk job (e.g. the embedding store) never holds the thread for
+longer than one full batch.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from metrics import batch_size, stage_seconds
+
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+# intra-op threads for torch on the inference thread; 0 keeps torch's default
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+
+
+class _Chunk:
+    __slots__ = ("kind", "items", "future")
+
+    def __init__(self, kind, items):
+        self.kind = kind
+        self.items = items
+        self.future = Future()
+
+
+class InferenceScheduler:
+    def __init__(self, max_batch=INFERENCE_MAX_BATCH, max_wait_ms=INFERENCE_MAX_WAIT_MS,
+                 num_threads=INFERENCE_THREADS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.num_threads = num_threads
+        self._handlers = {}
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats = {}
+
+    # ------------------------------------------------------------------ #
+    def register(self, kind, handler):
+        """`handler(items) -> results` with one result per item, in order."""
+        with self._cond:
+            self._handlers[kind] = handler
+
+    def batched(self, kind, handler):
+        """Register `handler` for `kind` unless one exists; return a blocking batched callable."""
+        with self._cond:
+            self._handlers.setdefault(kind, handler)
+        return lambda items: self.run(kind, items)
+
+    def submit(self, kind, items):
+        """
+        Queue `items` for `kind`; the returned Future resolves to their results.
+        More than `max_batch` items are queued one `max_batch` slice at a time,
+        each once the previous one has run, so chunks other requests submit in
+        the meantime are interleaved instead of waiting behind all of them.
+        """
+        items = list(items)
+        if len(items) <= self.max_batch:
+            return self._enqueue(kind, items)
+        slices = deque(items[i:i + self.max_batch] for i in range(0, len(items), self.max_batch))
+        future, results = Future(), []
+
+        def queue_next(part=None):
+            if part is not None:
+                if part.exception() is not None:
+                    future.set_exception(part.exception())
+                    return
+                results.extend(part.result())
+            if slices:
+                self._enqueue(kind, slices.popleft()).add_done_callback(queue_next)
+            else:
+                future.set_result(results)
+
+        queue_next()
+        return future
+
+    def _enqueue(self, kind, items):
+        chunk = _Chunk(kind, items)
+        if not chunk.items:
+            chunk.future.set_result([])
+            return chunk.future
+        with self._cond:
+            if kind not in self._handlers:
+                raise KeyError(f"No inference handler registered for '{kind}'")
+            self._ensure_thread()
+            self._queue.append(chunk)
+            self._cond.notify()
+        return chunk.future
+
+    def run(self, kind, items):
+        return self.submit(kind, items).result()
+
+    # ------------------------------------------------------------------ #
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="inference-scheduler", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            first = self._queue.popleft()
+            batch, size = [first], len(first.items)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                for chunk in list(self._queue):
+                    if chunk.kind == first.kind and size + len(chunk.items) <= self.max_batch:
+                        self._queue.remove(chunk)
+                        batch.append(chunk)
+                        size += len(chunk.items)
+                remaining = deadline - time.monotonic()
+                if size >= self.max_batch or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return first.kind, self._handlers[first.kind], batch
+
+    def _record(self, kind, size, seconds):
+        stage_seconds.observe(seconds, stage=f"inference:{kind}")
+        batch_size.observe(size, kind=kind)
+        stats = self._stats.setdefault(kind, {"batches": 0, "items": 0, "max_batch": 0, "seconds": 0.0})
+        stats["batches"] += 1
+        stats["items"] += size
+        stats["max_batch"] = max(stats["max_batch"], size)
+        stats["seconds"] += seconds
+
+    def _loop(self):
+        if self.num_threads:
+            import torch
+
+            torch.set_num_threads(self.num_threads)
+        while True:
+            kind, handler, batch = self._next_batch()
+            items = [item for chunk in batch for item in chunk.items]
+            start = time.perf_counter()
+            try:
+                results = handler(items)
+            except Exception as e:
+                for chunk in batch:
+                    chunk.future.set_exception(e)
+                continue
+            finally:
+                self._record(kind, len(items), time.perf_counter() - start)
+            offset = 0
+            for chunk in batch:
+                chunk.future.set_result(results[offset:offset + len(chunk.items)])
+                offset += len(chunk.items)
+
+    def stats(self):
+        with self._cond:
+            queued = sum(len(chunk.items) for chunk in self._queue)
+        out = {"queued_items": queued, "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000}
+        for kind, s in list(self._stats.items()):
+            out[kind] = {**s, "avg_batch": round(s["items"] / s["batches"], 2), "seconds": round(s["seconds"], 3)}
+        return out
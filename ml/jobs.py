@@ -0,0 +1,106 @@
+"""
+In-process job queue for asynchronous scrape-and-analyze requests.
+
+Jobs run on a bounded thread pool. Finished jobs are kept for `ttl` seconds so
+clients can poll for the result, and a job submitted under a key that already
+has a queued or running job is attached to that job instead of starting a
+second scrape.
+"""
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.result = None
+        self.http_status = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self, include_result=True):
+        data = {
+            "jobId": self.id,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.status == DONE:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._active_by_key = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def _run(self, job, fn, args):
+        job.status = RUNNING
+        job.started_at = time.time()
+        status = FAILED
+        try:
+            result = fn(*args)
+            # work functions return (body, http_status) like the Flask routes
+            if isinstance(result, tuple):
+                job.result, job.http_status = result
+            else:
+                job.result, job.http_status = result, 200
+            status = DONE
+        except Exception as e:
+            print(traceback.format_exc())
+            job.error = str(e)
+        finally:
+            # finished_at first: _expire treats any inactive job as having one
+            job.finished_at = time.time()
+            job.status = status
+            with self._lock:
+                if self._active_by_key.get(job.key) is job:
+                    del self._active_by_key[job.key]
+
+    def submit(self, key, fn, *args):
+        """Queue `fn(*args)` unless a job for `key` is already active. Returns (job, created)."""
+        with self._lock:
+            self._expire()
+            existing = self._active_by_key.get(key)
+            if existing is not None:
+                return existing, False
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._active_by_key[key] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
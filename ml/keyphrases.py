@@ -0,0 +1,360 @@
+"""
+Keyphrase extraction with batched, cached BERT embeddings.
+
+Candidate noun phrases are normalized and de-duplicated before embedding, the
+ones not already in the LRU cache are embedded together in padded batches, and
+all of them are ranked against the document embedding in one vectorized pass.
+Noun chunks come from a trimmed spaCy pipeline (no NER / lemmatizer) run over
+the individual reviews with `nlp.pipe`, and are counted across reviews.
+
+For large review sets `extract_with_stats` keeps within KEYPHRASE_BUDGET_MS:
+spaCy stops taking new reviews once half the budget is spent, only the
+KEYPHRASE_MAX_CANDIDATES most frequent phrases (dropping those seen fewer than
+KEYPHRASE_MIN_COUNT times) are kept, and uncached ones are embedded most
+frequent first, one batch at a time, until the budget runs out; phrases left
+without a vector are not ranked. With a list of reviews the BERT
+document vector is the frequency-weighted centroid of the candidates, so it
+covers every review instead of the first 512 tokens of the joined text.
+
+Cheaper rankers can replace the BERT pass (KEYPHRASE_RANKER):
+  tfidf   cosine between each phrase's and the document's TF-IDF vectors, using
+          the vectorizer shipped with the tfidf-mlp sentiment model
+  static  lookups in an offline phrase-embedding table (build_phrase_table.py)
+          stored as a memory-mapped .npy, ranked by centrality among candidates
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import span
+
+KEYPHRASE_RANKER = os.getenv("KEYPHRASE_RANKER", "bert")
+PHRASE_TABLE_DIR = os.getenv("PHRASE_TABLE_DIR", "phrase_table")
+PHRASE_CACHE_SIZE = int(os.getenv("PHRASE_CACHE_SIZE", "20000"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_MAX_LENGTH = 512
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+KEYPHRASE_BUDGET_MS = float(os.getenv("KEYPHRASE_BUDGET_MS", "2000"))
+KEYPHRASE_MAX_CANDIDATES = int(os.getenv("KEYPHRASE_MAX_CANDIDATES", "300"))
+KEYPHRASE_MIN_COUNT = int(os.getenv("KEYPHRASE_MIN_COUNT", "2"))
+# >1 forks worker processes on every call; only worth it for very large review sets
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+# noun_chunks only need POS tags and the dependency parse
+NOUN_CHUNK_EXCLUDE = ("ner", "lemmatizer", "textcat", "entity_ruler")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def load_noun_chunker(spacy_module, model="en_core_web_sm"):
+    """Load `model` without the components noun chunks do not use."""
+    return spacy_module.load(model, exclude=list(NOUN_CHUNK_EXCLUDE))
+
+
+def normalize_phrase(phrase):
+    """Lower-case and collapse whitespace so equivalent phrases share one key."""
+    return _WHITESPACE.sub(" ", phrase).strip().lower()
+
+
+class LRUCache:
+    """Small thread-safe LRU map used for phrase embeddings."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _cosine_to(matrix, vector):
+    """Cosine of every row of `matrix` with `vector`, as one matrix-vector product."""
+    vector = vector / (np.linalg.norm(vector) or 1.0)
+    norms = np.linalg.norm(matrix, axis=1)
+    return matrix @ vector / np.where(norms == 0, 1.0, norms)
+
+
+class TfidfRanker:
+    """Scores phrases by TF-IDF cosine with the document (one sparse mat-vec)."""
+
+    name = "tfidf"
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+
+    def vectors(self, keys):
+        """Sparse, L2-normalized TF-IDF rows for `keys` and which of them hit the vocabulary."""
+        phrases = self.vectorizer.transform(keys)
+        return phrases, np.diff(phrases.indptr) > 0
+
+    def score(self, text, keys):
+        phrases = self.vectors(keys)[0]
+        doc = self.vectorizer.transform([text])
+        # rows are L2-normalized by the vectorizer, so the dot product is the cosine
+        return np.asarray((phrases @ doc.T).todense()).ravel()
+
+
+class StaticTableRanker:
+    """
+    Scores phrases against a precomputed BERT phrase table. Unknown phrases
+    fall back to the mean of their known words; the document vector is the
+    mean of the candidates' vectors, so ranking is by centrality.
+    """
+
+    name = "static"
+
+    def __init__(self, table_dir=PHRASE_TABLE_DIR):
+        with open(os.path.join(table_dir, "phrases.json"), "r", encoding="utf-8") as f:
+            self.index = {phrase: i for i, phrase in enumerate(json.load(f))}
+        self.table = np.load(os.path.join(table_dir, "embeddings.npy"), mmap_mode="r")
+
+    def vectors(self, keys):
+        vecs = np.zeros((len(keys), self.table.shape[1]), dtype=np.float32)
+        known = np.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is not None:
+                rows = [row]
+            else:
+                rows = [self.index[w] for w in key.split() if w in self.index]
+            if rows:
+                vecs[i] = self.table[rows].astype(np.float32).mean(axis=0)
+                known[i] = True
+        return vecs, known
+
+    def score(self, text, keys):
+        vecs, known = self.vectors(keys)
+        if not known.any():
+            return np.zeros(len(keys), dtype=np.float32)
+        scores = _cosine_to(vecs, vecs[known].mean(axis=0))
+        scores[~known] = -1.0
+        return scores
+
+
+class KeyphraseEngine:
+    """
+    Ranks noun chunks of a text by cosine similarity to the text's BERT
+    embedding, or with `ranker.score(text, keys)` when a cheaper ranker is given.
+    """
+
+    def __init__(self, nlp, tokenizer=None, bert_model=None, cache_size=PHRASE_CACHE_SIZE,
+                 batch_size=EMBED_BATCH_SIZE, embed_fn=None, ranker=None,
+                 spacy_batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+        self.nlp = nlp
+        self.spacy_batch_size = spacy_batch_size
+        self.n_process = n_process
+        self.tokenizer = tokenizer
+        self.bert_model = bert_model
+        self.batch_size = batch_size
+        self.cache = LRUCache(cache_size)
+        # lets the service route embedding work through the shared inference scheduler
+        self.embed_fn = embed_fn or self.embed
+        self.ranker = ranker
+
+    def embed(self, texts):
+        """Mean-pooled BERT embeddings for `texts`, shape (len(texts), hidden)."""
+        import torch
+
+        # length-sorted so short phrases are not padded to a long document in the same batch
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunks = []
+        with torch.no_grad():
+            for start in range(0, len(order), self.batch_size):
+                batch = [texts[i] for i in order[start:start + self.batch_size]]
+                inputs = self.tokenizer(batch, return_tensors="pt", padding=True,
+                                        truncation=True, max_length=EMBED_MAX_LENGTH)
+                hidden = self.bert_model(**inputs).last_hidden_state
+                # mask out padding so batched vectors match single-text embeddings
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                chunks.append(pooled.cpu().numpy())
+        embeddings = np.empty((len(texts), chunks[0].shape[1]), dtype=chunks[0].dtype)
+        embeddings[order] = np.vstack(chunks)
+        return embeddings
+
+    def embed_phrases(self, phrases):
+        """Embeddings for normalized phrases, served from the cache where possible."""
+        found = {p: self.cache.get(p) for p in phrases}
+        missing = [p for p, vec in found.items() if vec is None]
+        if missing:
+            for phrase, vec in zip(missing, self.embed_fn(missing)):
+                self.cache.put(phrase, vec)
+                found[phrase] = vec
+        return np.vstack([found[p] for p in phrases])
+
+    def embed_within(self, keys, deadline):
+        """
+        Embed the uncached `keys` in order, one batch at a time, until
+        `deadline` (time.monotonic); the first batch always runs. Returns the
+        set of keys that have a vector.
+        """
+        missing = [key for key in keys if self.cache.get(key) is None]
+        embedded = set(keys) - set(missing)
+        for start in range(0, len(missing), self.batch_size):
+            if start and time.monotonic() > deadline:
+                break
+            batch = missing[start:start + self.batch_size]
+            for phrase, vec in zip(batch, self.embed_fn(batch)):
+                self.cache.put(phrase, vec)
+            embedded.update(batch)
+        return embedded
+
+    def candidates(self, texts):
+        """
+        Noun chunks of one text or a list of reviews as (normalized, surface
+        form, count) triples, in order of first occurrence.
+        """
+        return self.collect(texts)[0]
+
+    def phrase_vectors(self, keys):
+        """The vectors the active ranker compares phrases with (BERT ones come from the cache)."""
+        if self.ranker is not None:
+            return self.ranker.vectors(keys)[0]
+        return self.embed_phrases(keys)
+
+    def collect(self, texts, deadline=None):
+        """
+        `candidates`, stopping at `deadline` (time.monotonic). Also returns the
+        set of normalized phrases of every text that was read.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        seen = {}
+        counts = {}
+        mentions = []
+        for doc in self.nlp.pipe(texts, batch_size=self.spacy_batch_size, n_process=self.n_process):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            keys = set()
+            for chunk in doc.noun_chunks:
+                key = normalize_phrase(chunk.text)
+                if not key:
+                    continue
+                if key not in seen:
+                    seen[key] = chunk.text.strip()
+                counts[key] = counts.get(key, 0) + 1
+                keys.add(key)
+            mentions.append(keys)
+        return [(key, surface, counts[key]) for key, surface in seen.items()], mentions
+
+    @staticmethod
+    def prune(candidates, max_candidates=KEYPHRASE_MAX_CANDIDATES, min_count=KEYPHRASE_MIN_COUNT):
+        """Keep the `max_candidates` most frequent candidates, in first-occurrence order."""
+        if len(candidates) <= max_candidates:
+            return candidates
+        frequent = [c for c in candidates if c[2] >= min_count] or candidates
+        keep = sorted(range(len(frequent)), key=lambda i: -frequent[i][2])[:max_candidates]
+        return [frequent[i] for i in sorted(keep)]
+
+    def score(self, texts, keys, counts=None):
+        """Similarity of each normalized phrase in `keys` to one text or a list of reviews."""
+        text = texts if isinstance(texts, str) else " ".join(texts)
+        if self.ranker is not None:
+            return self.ranker.score(text, keys)
+        phrase_embs = self.embed_phrases(keys)
+        if isinstance(texts, str):
+            doc_emb = self.embed_fn([text])[0]
+        else:
+            doc_emb = np.average(phrase_embs, axis=0, weights=counts)
+        return _cosine_to(phrase_embs, doc_emb)
+
+    def extract(self, texts, top_n=5):
+        """Top `top_n` noun phrases of one text or a list of reviews."""
+        return self.extract_with_stats(texts, top_n, budget_ms=None)[0]
+
+    def extract_with_stats(self, texts, top_n=5, budget_ms=KEYPHRASE_BUDGET_MS,
+                           max_candidates=KEYPHRASE_MAX_CANDIDATES, min_count=KEYPHRASE_MIN_COUNT):
+        """`extract` within a latency budget; also returns how much of the input was used."""
+        ranking = self.rank(texts, budget_ms, max_candidates, min_count)
+        return ranking.top(top_n), ranking.stats
+
+    def rank(self, texts, budget_ms=KEYPHRASE_BUDGET_MS, max_candidates=KEYPHRASE_MAX_CANDIDATES,
+             min_count=KEYPHRASE_MIN_COUNT):
+        """Score every kept candidate of one text or a list of reviews; see `Ranking`."""
+        start = time.monotonic()
+        deadline = start + budget_ms / 2000.0 if budget_ms else None
+        with span("spacy"):
+            candidates, mentions = self.collect(texts, deadline)
+        total = len(candidates)
+        candidates = self.prune(candidates, max_candidates, min_count)
+        if isinstance(texts, str):
+            used, n_texts = texts, 1
+        else:
+            used, n_texts = list(texts)[:len(mentions)], len(texts)
+
+        over_budget = 0
+        if candidates and budget_ms and self.ranker is None:
+            # most frequent first, so running out of budget drops the rarest phrases
+            by_count = sorted(candidates, key=lambda c: -c[2])
+            with span("keyphrase_embed"):
+                embedded = self.embed_within([key for key, _, _ in by_count], start + budget_ms / 1000.0)
+            kept = [c for c in candidates if c[0] in embedded]
+            over_budget = len(candidates) - len(kept)
+            candidates = kept
+
+        scores = np.zeros(0, dtype=np.float32)
+        if candidates:
+            with span(f"keyphrase_rank:{self.ranker.name if self.ranker else 'bert'}"):
+                scores = self.score(used, [key for key, _, _ in candidates], [count for _, _, count in candidates])
+        return Ranking(candidates, mentions, scores, {
+            "reviews_total": n_texts,
+            "reviews_considered": len(mentions),
+            "candidates_total": total,
+            "candidates_ranked": len(candidates),
+            "candidates_over_budget": over_budget,
+            "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+        })
+
+
+class Ranking:
+    """
+    Output of KeyphraseEngine.rank: the kept (key, surface, count) candidates,
+    their scores, and for every review that was read the set of its phrases.
+    """
+
+    def __init__(self, candidates, mentions, scores, stats):
+        self.candidates = candidates
+        self.mentions = mentions
+        self.scores = scores
+        self.stats = stats
+        self.order = np.argsort(scores)[::-1]
+
+    @property
+    def keys(self):
+        return [key for key, _, _ in self.candidates]
+
+    def top(self, n):
+        return [self.candidates[i][1] for i in self.order[:n]]
+
+    def mention_matrix(self):
+        """(reviews read, candidates) 0/1 matrix of which review mentions which candidate."""
+        index = {key: i for i, key in enumerate(self.keys)}
+        pairs = [(r, index[key]) for r, keys in enumerate(self.mentions) for key in keys if key in index]
+        matrix = np.zeros((len(self.mentions), len(self.candidates)), dtype=np.float32)
+        if pairs:
+            rows, cols = np.array(pairs).T
+            matrix[rows, cols] = 1.0
+        return matrix
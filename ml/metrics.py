@@ -0,0 +1,204 @@
+"""
+Lightweight span timers, counters and histograms with Prometheus text output.
+
+    with span("spacy"):
+        ...
+
+records the block's duration in the `feedback_stage_seconds` histogram,
+labelled by stage, and, when the current request opted in with the debug
+header, in that request's trace too. Traces live in a ContextVar, so stages
+that run on worker threads (page fetches, the inference thread) only reach
+the histograms. Existing stats dicts (result cache, inference scheduler...)
+are exported through `register_collector` instead of being counted twice.
+"""
+import contextvars
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_INVALID = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in sorted(labels.items()))
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_labels(dict(key))} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in self._series.items():
+                labels = dict(key)
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f"{self.name}_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {series['count']}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {round(series['sum'], 6)}")
+                lines.append(f"{self.name}_count{_labels(labels)} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, prefix, fn):
+        """Export the numeric values of the dict returned by `fn()` as gauges named `prefix_<key>`."""
+        self._collectors.append((prefix, fn))
+
+    def _collect(self, prefix, stats, labels=None):
+        samples = []
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                samples.append((_INVALID.sub("_", f"{prefix}_{key}"), labels, value))
+            elif isinstance(value, dict):
+                # nested dicts (e.g. per-kind scheduler stats) become a `key` label
+                samples.extend(self._collect(prefix, value, {**(labels or {}), "key": key}))
+        return samples
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        gauges = {}
+        for prefix, fn in self._collectors:
+            try:
+                for name, labels, value in self._collect(prefix, fn()):
+                    gauges.setdefault(name, []).append(f"{name}{_labels(labels)} {value}")
+            except Exception as e:
+                print(f"[WARN] Metrics collector {prefix} failed: {e}")
+        for name, samples in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+stage_seconds = REGISTRY.histogram("feedback_stage_seconds", "Time spent per pipeline stage")
+batch_size = REGISTRY.histogram("feedback_inference_batch_size", "Items per model forward pass", SIZE_BUCKETS)
+reviews_scraped = REGISTRY.counter("feedback_reviews_scraped_total", "Reviews scraped, by site")
+cache_lookups = REGISTRY.counter("feedback_cache_lookups_total", "Result cache lookups, by outcome")
+browser_crashes = REGISTRY.counter("feedback_browser_crashes_total", "Pooled browsers discarded as unhealthy")
+browser_launches = REGISTRY.counter("feedback_browser_launches_total", "Chrome instances started")
+
+
+# ----------------------------------------------------------------------------- #
+class Trace:
+    """Per-request stage timings, summed per stage."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            total, count = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + seconds, count + 1)
+
+    def summary(self):
+        with self._lock:
+            stages = {s: {"ms": round(t * 1000, 1), "count": c} for s, (t, c) in self.stages.items()}
+        return {"total_ms": round((time.perf_counter() - self.start) * 1000, 1), "stages": stages}
+
+    def server_timing(self):
+        with self._lock:
+            return ", ".join(f"{_INVALID.sub('_', s)};dur={t * 1000:.1f}" for s, (t, _) in self.stages.items())
+
+
+def start_trace():
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def end_trace():
+    _current_trace.set(None)
+
+
+def timed_iter(iterable, stage):
+    """Yield from `iterable`, timing only the time spent producing items (not the consumer's)."""
+    iterator = iter(iterable)
+    while True:
+        with span(stage):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(stage, elapsed)
@@ -0,0 +1,190 @@
+"""
+Pre-compiled model bundle for fast service start-up.
+
+`compile_models.py` writes the bundle; the service loads it when
+MODEL_BUNDLE_DIR points at one. Layout:
+
+    manifest.json                 versions, source model names, quantization flag
+    bert/tokenizer/               saved HF tokenizer
+    bert/encoder.pt               TorchScript-traced bert-base-uncased encoder
+    sentiment/tokenizer/          saved HF tokenizer of the sentiment pipeline
+    sentiment/classifier.pt       TorchScript-traced sequence classifier
+    tfidf/*.npy, *.json           TF-IDF vocabulary/idf and MLP weights as raw arrays
+
+The TorchScript archives skip HF model construction and config resolution. The
+NumPy arrays are memory-mapped (`mmap_mode="r"`), so the TF-IDF backend pages
+its weights in lazily and shares them between worker processes.
+"""
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from quantization import quantize_dynamic
+
+MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR", "")
+MANIFEST = "manifest.json"
+
+
+def bundle_available(path=MODEL_BUNDLE_DIR):
+    return bool(path) and os.path.exists(os.path.join(path, MANIFEST))
+
+
+def load_manifest(path=MODEL_BUNDLE_DIR):
+    with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------------- #
+# Adapters: give traced modules the keyword/attribute interface the code expects
+# ----------------------------------------------------------------------------- #
+class TracedEncoder:
+    """Callable like an HF AutoModel, returning `.last_hidden_state`."""
+
+    def __init__(self, module):
+        self.module = module
+
+    def __call__(self, input_ids, attention_mask, **_):
+        return SimpleNamespace(last_hidden_state=self.module(input_ids, attention_mask)[0])
+
+    def eval(self):
+        self.module.eval()
+        return self
+
+
+class TracedClassifier:
+    """Callable like an HF sequence classifier, returning `.logits`, with `.config.id2label`."""
+
+    def __init__(self, module, id2label):
+        self.module = module
+        self.config = SimpleNamespace(id2label=id2label)
+
+    def __call__(self, input_ids, attention_mask, **_):
+        return SimpleNamespace(logits=self.module(input_ids, attention_mask)[0])
+
+    def eval(self):
+        self.module.eval()
+        return self
+
+
+class BundledPipeline:
+    """Stands in for `pipeline("sentiment-analysis")` in sentiment.predict_sentiments."""
+
+    def __init__(self, tokenizer, model):
+        self.tokenizer = tokenizer
+        self.model = model
+
+
+# ----------------------------------------------------------------------------- #
+# Export
+# ----------------------------------------------------------------------------- #
+def trace(model, tokenizer):
+    import torch
+
+    example = tokenizer(
+        ["a short review", "a second, noticeably longer example review to vary the shape"],
+        padding=True, return_tensors="pt",
+    )
+    with torch.no_grad():
+        return torch.jit.trace(model, (example["input_ids"], example["attention_mask"]), strict=False)
+
+
+def export_transformers(out_dir, bert_name="bert-base-uncased", quantize=False):
+    import torch
+    import transformers
+
+    bert_tokenizer = transformers.AutoTokenizer.from_pretrained(bert_name)
+    bert = transformers.AutoModel.from_pretrained(bert_name, torchscript=True).eval()
+    if quantize:
+        bert = quantize_dynamic(bert)
+    bert_tokenizer.save_pretrained(os.path.join(out_dir, "bert", "tokenizer"))
+    torch.jit.save(trace(bert, bert_tokenizer), os.path.join(out_dir, "bert", "encoder.pt"))
+
+    pipe = transformers.pipeline("sentiment-analysis")
+    sentiment_name = pipe.model.name_or_path
+    classifier = transformers.AutoModelForSequenceClassification.from_pretrained(
+        sentiment_name, torchscript=True
+    ).eval()
+    if quantize:
+        classifier = quantize_dynamic(classifier)
+    pipe.tokenizer.save_pretrained(os.path.join(out_dir, "sentiment", "tokenizer"))
+    torch.jit.save(trace(classifier, pipe.tokenizer), os.path.join(out_dir, "sentiment", "classifier.pt"))
+
+    return {
+        "bert": bert_name,
+        "sentiment": sentiment_name,
+        "id2label": {str(k): v for k, v in classifier.config.id2label.items()},
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+    }
+
+
+def export_tfidf(out_dir, backend):
+    """Write a TfidfMlpBackend's vectorizer and weights as plain JSON / .npy files."""
+    tfidf_dir = os.path.join(out_dir, "tfidf")
+    os.makedirs(tfidf_dir, exist_ok=True)
+    vectorizer = backend.vectorizer
+    params = {
+        k: v for k, v in vectorizer.get_params().items()
+        if k not in ("vocabulary", "dtype", "preprocessor", "tokenizer", "analyzer")
+        and isinstance(v, (str, int, float, bool, list, tuple, type(None)))
+    }
+    if not isinstance(vectorizer.analyzer, str):
+        raise ValueError("Only string analyzers can be exported")
+    params["analyzer"] = vectorizer.analyzer
+    with open(os.path.join(tfidf_dir, "params.json"), "w", encoding="utf-8") as f:
+        json.dump(params, f)
+    with open(os.path.join(tfidf_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+        json.dump({term: int(i) for term, i in vectorizer.vocabulary_.items()}, f)
+    with open(os.path.join(tfidf_dir, "classes.json"), "w", encoding="utf-8") as f:
+        json.dump([str(c) for c in backend.classes], f)
+    np.save(os.path.join(tfidf_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    for name in ("w1", "b1", "w2", "b2"):
+        np.save(os.path.join(tfidf_dir, f"{name}.npy"), np.ascontiguousarray(getattr(backend, name)))
+
+
+# ----------------------------------------------------------------------------- #
+# Load
+# ----------------------------------------------------------------------------- #
+def load_bert(path=MODEL_BUNDLE_DIR):
+    import torch
+    import transformers
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained(os.path.join(path, "bert", "tokenizer"))
+    module = torch.jit.load(os.path.join(path, "bert", "encoder.pt"), map_location="cpu")
+    return tokenizer, TracedEncoder(module).eval()
+
+
+def load_sentiment_pipeline(path=MODEL_BUNDLE_DIR):
+    import torch
+    import transformers
+
+    manifest = load_manifest(path)
+    id2label = {int(k): v for k, v in manifest["models"]["id2label"].items()}
+    tokenizer = transformers.AutoTokenizer.from_pretrained(os.path.join(path, "sentiment", "tokenizer"))
+    module = torch.jit.load(os.path.join(path, "sentiment", "classifier.pt"), map_location="cpu")
+    return BundledPipeline(tokenizer, TracedClassifier(module, id2label).eval())
+
+
+def load_tfidf_backend(path=MODEL_BUNDLE_DIR):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from sentiment import TfidfMlpBackend
+
+    tfidf_dir = os.path.join(path, "tfidf")
+    with open(os.path.join(tfidf_dir, "params.json"), "r", encoding="utf-8") as f:
+        params = json.load(f)
+    with open(os.path.join(tfidf_dir, "vocabulary.json"), "r", encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    with open(os.path.join(tfidf_dir, "classes.json"), "r", encoding="utf-8") as f:
+        classes = json.load(f)
+    if isinstance(params.get("ngram_range"), list):
+        params["ngram_range"] = tuple(params["ngram_range"])
+
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, dtype=np.float32, **params)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = np.load(os.path.join(tfidf_dir, "idf.npy"))
+    weights = {name: np.load(os.path.join(tfidf_dir, f"{name}.npy"), mmap_mode="r")
+               for name in ("w1", "b1", "w2", "b2")}
+    return TfidfMlpBackend(vectorizer, classes, **weights)
@@ -0,0 +1,107 @@
+"""
+Lazy model registry for the ML service.
+
+Each component (spaCy, BERT, the sentiment pipeline, the Selenium scrapers...)
+is registered with a loader and only built on first use, or ahead of time by a
+background warm-up thread. Heavy libraries are imported inside the loaders, so
+the Flask port opens without waiting on torch/transformers. Import and load
+times are recorded per component and reported by /health.
+"""
+import importlib
+import threading
+import time
+import traceback
+
+NOT_LOADED, LOADING, READY, FAILED = "not_loaded", "loading", "ready", "failed"
+
+
+class _Component:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.state = NOT_LOADED
+        self.error = None
+        self.load_seconds = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._components = {}
+        self.import_seconds = {}
+        self._import_lock = threading.Lock()
+
+    def register(self, name, loader):
+        self._components[name] = _Component(name, loader)
+
+    def timed_import(self, module_name):
+        """Import a module, recording how long the first import took."""
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed = time.perf_counter() - start
+        with self._import_lock:
+            # later imports hit sys.modules and are ~free; keep the first, real cost
+            self.import_seconds.setdefault(module_name, round(elapsed, 3))
+        return module
+
+    def get(self, name):
+        """Return the loaded component, loading it now if needed. Raises if loading failed."""
+        component = self._components[name]
+        if component.state == READY:
+            return component.value
+        with component.lock:
+            if component.state != READY:
+                component.state = LOADING
+                print(f"[INFO] Loading {name}...")
+                start = time.perf_counter()
+                try:
+                    component.value = component.loader()
+                except Exception as e:
+                    component.state = FAILED
+                    component.error = str(e)
+                    print(f"[ERROR] Loading {name} failed: {e}")
+                    raise
+                component.load_seconds = round(time.perf_counter() - start, 3)
+                component.error = None
+                component.state = READY
+                print(f"[INFO] {name} ready in {component.load_seconds:.2f}s ✅")
+        return component.value
+
+    def __contains__(self, name):
+        return name in self._components
+
+    def is_ready(self, name):
+        return self._components[name].state == READY
+
+    def ready(self, names):
+        return all(self.is_ready(name) for name in names)
+
+    def warm_up(self, names=None):
+        """Load components in a background thread, in registration order."""
+        names = list(names or self._components)
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    traceback.print_exc()
+
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        return {
+            name: {
+                "state": c.state,
+                "load_seconds": c.load_seconds,
+                **({"error": c.error} if c.error else {}),
+            }
+            for name, c in self._components.items()
+        }
+
+    @property
+    def all_ready(self):
+        return all(c.state == READY for c in self._components.values())
@@ -0,0 +1,85 @@
+"""
+Review-listing page URLs and concurrent, in-order page fetching.
+
+Instead of clicking "Next" page by page, the review-listing URL of every page
+is computed up front:
+
+    amazon    https://www.amazon.<tld>/product-reviews/<ASIN>/?reviewerType=all_reviews&pageNumber=N
+    flipkart  https://www.flipkart.com/<slug>/product-reviews/<itm id>?pid=<pid>&page=N
+
+`fetch_in_order` then keeps up to SCRAPE_CONCURRENCY pages in flight and
+yields them in page order, stopping at the first empty or repeated page or
+after SCRAPE_PAGE_BUDGET pages.
+"""
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from canonical import normalized_host, product_key
+
+SCRAPE_PAGE_BUDGET = int(os.getenv("SCRAPE_PAGE_BUDGET", "10"))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", os.getenv("BROWSER_POOL_SIZE", "2")))
+
+_FLIPKART_LISTING = re.compile(r"(/[^/]+)?/(?:p|product-reviews)/(itm[0-9a-z]+)", re.I)
+
+
+def amazon_review_page_url(product_url, page):
+    parts = urlsplit(product_url if "://" in product_url else "https://" + product_url)
+    key = product_key(product_url)
+    host = normalized_host(parts)
+    if not host.startswith("amazon.") or not key.startswith(host + ":"):
+        return None
+    asin = key.split(":", 1)[1]
+    query = urlencode({"ie": "UTF8", "reviewerType": "all_reviews", "pageNumber": page})
+    return urlunsplit(("https", "www." + host, f"/product-reviews/{asin}/", query, ""))
+
+
+def flipkart_review_page_url(product_url, page):
+    parts = urlsplit(product_url if "://" in product_url else "https://" + product_url)
+    match = _FLIPKART_LISTING.search(parts.path)
+    if normalized_host(parts) != "flipkart.com" or not match:
+        return None
+    slug, item = match.group(1) or "", match.group(2)
+    params = {"page": page}
+    pid = parse_qs(parts.query).get("pid")
+    if pid:
+        params = {"pid": pid[0], **params}
+    return urlunsplit(("https", "www.flipkart.com", f"{slug}/product-reviews/{item}", urlencode(params), ""))
+
+
+def review_page_urls(product_url, pages=SCRAPE_PAGE_BUDGET):
+    """URLs of review pages 1..`pages`, or [] if they cannot be derived from `product_url`."""
+    for build in (amazon_review_page_url, flipkart_review_page_url):
+        if build(product_url, 1):
+            return [build(product_url, page) for page in range(1, pages + 1)]
+    return []
+
+
+def fetch_in_order(fetch, urls, concurrency=SCRAPE_CONCURRENCY):
+    """
+    Call `fetch(url)` with up to `concurrency` calls in flight and yield the
+    non-empty results in URL order. Stops at the first empty page, or at a
+    page whose first record was already seen (sites serve the last page again
+    past the end).
+    """
+    urls = iter(urls)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="scrape-page")
+    pending = deque(executor.submit(fetch, url) for url in islice(urls, max(1, concurrency)))
+    seen = []
+    try:
+        while pending:
+            records = pending.popleft().result()
+            if not records or records[0] in seen:
+                break
+            seen.append(records[0])
+            yield records
+            url = next(urls, None)
+            if url is not None:
+                pending.append(executor.submit(fetch, url))
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
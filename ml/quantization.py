@@ -0,0 +1,28 @@
+"""
+Dynamic int8 quantization for the CPU transformer models.
+
+With QUANTIZE_MODELS=1 the service swaps every nn.Linear in the BERT encoder
+and in the sentiment classifier for a dynamically quantized one (int8 weights,
+activations quantized per batch). This is where almost all of their CPU time
+goes; `benchmark_quantization.py` measures the trade-off on a fixed corpus.
+"""
+import os
+
+QUANTIZE_MODELS = os.getenv("QUANTIZE_MODELS", "0") == "1"
+# fbgemm on x86, qnnpack on ARM; empty keeps torch's default
+QUANTIZED_ENGINE = os.getenv("QUANTIZED_ENGINE", "")
+
+
+def quantize_dynamic(model):
+    """int8 weights for every nn.Linear, activations quantized on the fly."""
+    import torch
+
+    if QUANTIZED_ENGINE:
+        torch.backends.quantized.engine = QUANTIZED_ENGINE
+    return torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_pipeline(pipe):
+    """Quantize the model behind a HuggingFace pipeline in place and return the pipeline."""
+    pipe.model = quantize_dynamic(pipe.model)
+    return pipe
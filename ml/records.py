@@ -0,0 +1,42 @@
+"""Review records shared by the browser and HTTP scrapers."""
+import re
+
+# star ratings read as "4.0 out of 5 stars" (Amazon) or "5" / "4★" (Flipkart)
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Amazon title links also hold the visually hidden star rating text
+_RATING_PREFIX = re.compile(r"^\s*\d(?:\.\d)?\s+out of 5 stars\s*")
+
+
+def parse_rating(text):
+    match = _NUMBER.search(text or "")
+    return float(match.group()) if match else None
+
+
+def clean_title(text):
+    return _RATING_PREFIX.sub("", text or "").strip()
+
+
+def normalize_reviews(reviews):
+    min_len = min(len(reviews["review_text"]), len(reviews["rating"]), len(reviews["review_title"]))
+    for key in reviews:
+        reviews[key] = reviews[key][:min_len]
+    return reviews
+
+
+def page_records(reviews):
+    """Turn one page's column lists into aligned review records."""
+    reviews = normalize_reviews(reviews)
+    return [
+        {"review_text": text, "rating": rating, "review_title": title}
+        for text, rating, title in zip(reviews["review_text"], reviews["rating"], reviews["review_title"])
+    ]
+
+
+def card_records(cards):
+    """Records from per-review-card dicts ({"text", "rating", "title"}), so fields never misalign."""
+    return [
+        {"review_text": card["text"].strip(), "rating": parse_rating(card.get("rating")),
+         "review_title": clean_title(card.get("title"))}
+        for card in cards
+        if (card.get("text") or "").strip()
+    ]
@@ -0,0 +1,136 @@
+"""
+HTTP-first short-link resolution.
+
+amzn.in links are followed with a pooled `requests.Session` (HEAD first, then a
+streamed GET for hosts that reject HEAD). Only when that does not land on an
+Amazon page is the caller's browser fallback used. Resolved links are kept in
+a small JSON file with a TTL so repeated shares of the same link skip the
+network entirely.
+"""
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SHORTLINK_HOSTS = ("amzn.in", "amzn.to", "a.co")
+SHORTLINK_CACHE_PATH = os.getenv("SHORTLINK_CACHE_PATH", os.path.join(".cache", "shortlinks.json"))
+SHORTLINK_CACHE_TTL = int(os.getenv("SHORTLINK_CACHE_TTL", str(7 * 24 * 3600)))
+SHORTLINK_TIMEOUT = float(os.getenv("SHORTLINK_TIMEOUT", "6"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-IN,en;q=0.9"})
+    return session
+
+
+http_session = _build_session()
+
+
+def is_short_link(url):
+    host = url.split("://", 1)[-1].split("/", 1)[0].lower()
+    return any(host == h or host.endswith("." + h) for h in SHORTLINK_HOSTS)
+
+
+def _looks_resolved(url):
+    return bool(url) and "amazon." in url and not is_short_link(url)
+
+
+class ShortLinkCache:
+    """short link -> canonical URL, persisted as JSON and expired after `ttl` seconds."""
+
+    def __init__(self, path=SHORTLINK_CACHE_PATH, ttl=SHORTLINK_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not persist short-link cache: {e}")
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and time.time() - entry["at"] < self.ttl:
+                return entry["url"]
+            return None
+
+    def put(self, url, resolved):
+        with self._lock:
+            now = time.time()
+            self._entries = {k: v for k, v in self._entries.items() if now - v["at"] < self.ttl}
+            self._entries[url] = {"url": resolved, "at": now}
+            self._save()
+
+
+shortlink_cache = ShortLinkCache()
+
+
+def resolve_via_http(url, timeout=SHORTLINK_TIMEOUT):
+    """Follow redirects over HTTP. Returns the final URL, or None if it did not resolve."""
+    try:
+        resp = http_session.head(url, allow_redirects=True, timeout=timeout)
+        if _looks_resolved(resp.url):
+            return resp.url
+    except requests.RequestException:
+        pass
+    try:
+        with http_session.get(url, allow_redirects=True, timeout=timeout, stream=True) as resp:
+            if _looks_resolved(resp.url):
+                return resp.url
+    except requests.RequestException:
+        pass
+    return None
+
+
+def resolve_short_link(url, browser_fallback=None):
+    """
+    Expand a short link: cache -> HTTP redirects -> `browser_fallback(url)`.
+    Non-short links and unresolvable links are returned unchanged.
+    """
+    if not is_short_link(url):
+        return url
+
+    cached = shortlink_cache.get(url)
+    if cached:
+        print(f"[INFO] Short link served from cache: {cached}")
+        return cached
+
+    resolved = resolve_via_http(url)
+    if resolved:
+        print(f"[INFO] Short link resolved via HTTP: {resolved}")
+    elif browser_fallback is not None:
+        print("[INFO] HTTP resolution failed, falling back to browser...")
+        resolved = browser_fallback(url)
+        if not _looks_resolved(resolved):
+            resolved = None
+
+    if not resolved:
+        return url
+    shortlink_cache.put(url, resolved)
+    return resolved
@@ -0,0 +1,226 @@
+"""
+Two-tier cache for analysis results, plus single-flight coalescing.
+
+Lookups go to an in-process LRU+TTL map first and MongoDB second. Mongo
+lookups only accept entries younger than RESULT_CACHE_TTL, and a TTL index on
+`timestamp` deletes older ones. The index is partial (`cacheEntry: true`)
+because the collection also holds the backend's per-user search history,
+which must not expire.
+Entries are keyed by the canonical product key from `canonical.product_key`.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pymongo
+
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(30 * 24 * 3600)))
+RESULT_CACHE_MEMORY_SIZE = int(os.getenv("RESULT_CACHE_MEMORY_SIZE", "256"))
+RESULT_CACHE_MEMORY_TTL = int(os.getenv("RESULT_CACHE_MEMORY_TTL", str(6 * 3600)))
+
+CACHE_FILTER = {"cacheEntry": True}
+
+
+class MemoryTier:
+    """Thread-safe LRU map whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResultCache:
+    def __init__(self, collection, ttl=RESULT_CACHE_TTL, memory_size=RESULT_CACHE_MEMORY_SIZE,
+                 memory_ttl=RESULT_CACHE_MEMORY_TTL):
+        self.collection = collection
+        self.ttl = ttl
+        self.memory = MemoryTier(memory_size, min(memory_ttl, ttl))
+        self._lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "writes": 0,
+            "lookup_seconds_total": 0.0,
+            "lookups": 0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def ensure_indexes(self):
+        """Create the lookup index and the TTL index that deletes expired entries."""
+        try:
+            self.collection.create_index(
+                [("productKey", pymongo.ASCENDING), ("timestamp", pymongo.DESCENDING)],
+                name="cache_lookup",
+                partialFilterExpression=CACHE_FILTER,
+            )
+            self.collection.create_index(
+                "timestamp",
+                name="cache_ttl",
+                expireAfterSeconds=self.ttl,
+                partialFilterExpression=CACHE_FILTER,
+            )
+        except Exception as e:
+            print(f"[WARN] Could not create cache indexes: {e}")
+
+    def get(self, key):
+        start = time.perf_counter()
+        try:
+            value = self.memory.get(key)
+            if value is not None:
+                self._count("memory_hits")
+                return value
+            try:
+                # the TTL index only cleans up; freshness must not depend on it having been created
+                fresh = {"$gte": datetime.utcnow() - timedelta(seconds=self.ttl)}
+                doc = self.collection.find_one(
+                    {"productKey": key, "timestamp": fresh, **CACHE_FILTER},
+                    sort=[("timestamp", pymongo.DESCENDING)],
+                )
+            except Exception as e:
+                self._count("errors")
+                print(f"[WARN] Cache check failed: {e}")
+                doc = None
+            if doc is None:
+                self._count("misses")
+                return None
+            self._count("mongo_hits")
+            self.memory.put(key, doc["searchResponse"])
+            return doc["searchResponse"]
+        finally:
+            self._count("lookup_seconds_total", time.perf_counter() - start)
+            self._count("lookups")
+
+    def put(self, key, response, url=None):
+        self.memory.put(key, response)
+        try:
+            self.collection.insert_one({
+                "searchUrl": url or key,
+                "productKey": key,
+                "searchResponse": response,
+                "timestamp": datetime.utcnow(),
+                **CACHE_FILTER,
+            })
+            self._count("writes")
+        except Exception as e:
+            self._count("errors")
+            print(f"[WARN] Cache write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["lookups"] or 1
+        hits = stats["memory_hits"] + stats["mongo_hits"]
+        stats["hit_ratio"] = round(hits / lookups, 4)
+        stats["avg_lookup_ms"] = round(1000 * stats["lookup_seconds_total"] / lookups, 3)
+        stats["memory_entries"] = len(self.memory)
+        return stats
+
+
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """
+    Run at most one `fn` per key at a time; concurrent callers share its result.
+
+    `do_events` is the streaming variant: the leader yields every event of its
+    generator, callers joining it (through either method) get only the result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def _join(self, key):
+        """Returns (call, leader), registering a new call for `key` if none is in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {"done": threading.Event(), "result": _ABANDONED, "error": None}
+                return call, True
+            self.coalesced += 1
+            return call, False
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+        call["done"].set()
+
+    def _lead(self, key):
+        """Wait out in-flight calls for `key` until this caller leads one or gets a result."""
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                return call, None
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            # a streaming leader whose client went away leaves no result: try to lead instead
+            if call["result"] is not _ABANDONED:
+                return None, call["result"]
+
+    def do(self, key, fn, *args):
+        call, result = self._lead(key)
+        if call is None:
+            return result
+        try:
+            call["result"] = fn(*args)
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def do_events(self, key, events, *args):
+        """
+        Iterate `events(*args)`, a generator of (event, payload) pairs whose
+        ("result", payload) is shared with concurrent callers. A caller that
+        joins an in-flight call gets just ("result", payload).
+        """
+        call, result = self._lead(key)
+        if call is None:
+            yield "result", result
+            return
+        try:
+            for event, payload in events(*args):
+                if event == "result":
+                    call["result"] = payload
+                yield event, payload
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            self._finish(key, call)
@@ -0,0 +1,267 @@
+"""
+Selenium scrapers for Amazon and Flipkart review pages.
+
+Imported lazily by app.py (through the model registry) so that selenium and
+undetected_chromedriver are not loaded before the first scrape. Review pages
+are fetched concurrently across pooled browsers (see pagination.py).
+"""
+import os
+
+import undetected_chromedriver as uc
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from browser_pool import create_pool
+from browser_profile import apply_prefs, install_blocking, load_stats
+from metrics import span
+import http_scraper
+from http_scraper import SCRAPER_BACKEND
+from records import card_records, page_records
+from pagination import SCRAPE_CONCURRENCY, SCRAPE_PAGE_BUDGET, fetch_in_order, review_page_urls
+from waits import StepTimer, wait_for_count, wait_for_ready, wait_for_stale, wait_for_url
+
+CHROME_PATH = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+# "script": one execute_script per page returning every review card;
+# "elements": the per-element find_elements / .text round-trips
+SCRAPE_EXTRACTION = os.getenv("SCRAPE_EXTRACTION", "script")
+
+
+def setup_browser():
+    """Configure headless Chrome for scraping."""
+    options = uc.ChromeOptions()
+    options.binary_location = CHROME_PATH
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+    apply_prefs(options)
+
+    browser = uc.Chrome(
+        options=options,
+        browser_executable_path=CHROME_PATH
+    )
+    return install_blocking(browser)
+
+
+# warm Chrome instances shared by the scrapers and the short-link resolver
+browser_pool = create_pool(setup_browser)
+
+
+AMAZON_REVIEW_BODY = (By.CSS_SELECTOR, 'span[data-hook="review-body"]')
+FLIPKART_REVIEW_BODY = (By.CLASS_NAME, "ZmyHeo")
+
+
+def extract_amazon_page(browser):
+    """Review records of the Amazon page currently loaded in `browser`."""
+    reviews = {"review_text": [], "rating": [], "review_title": []}
+    review_elements = browser.find_elements(*AMAZON_REVIEW_BODY)
+    rating_elements = browser.find_elements(By.CLASS_NAME, "review-rating")
+    title_elements = browser.find_elements(By.CSS_SELECTOR, 'a[data-hook="review-title"]')
+
+    for review in review_elements:
+        reviews["review_text"].append(review.text.strip())
+
+    for rating in rating_elements:
+        val = rating.get_attribute("textContent").replace(" out of 5 stars", "")
+        try:
+            reviews["rating"].append(float(val))
+        except:
+            reviews["rating"].append(None)
+
+    for title in title_elements:
+        reviews["review_title"].append(title.text.strip())
+
+    return page_records(reviews)
+
+
+def extract_flipkart_page(browser):
+    """Review records of the Flipkart page currently loaded in `browser`."""
+    reviews = {"review_text": [], "rating": [], "review_title": []}
+    review_elements = browser.find_elements(*FLIPKART_REVIEW_BODY)
+    for review in review_elements:
+        reviews["review_text"].append(review.text.strip())
+
+    rating_elements = browser.find_elements(By.CLASS_NAME, "XQDdHH")
+    for rating in rating_elements:
+        try:
+            reviews["rating"].append(float(rating.text.split()[0]))
+        except:
+            reviews["rating"].append(None)
+
+    title_elements = browser.find_elements(By.CSS_SELECTOR, "p.z9E0IG")
+    for title in title_elements:
+        reviews["review_title"].append(title.text.strip())
+
+    return page_records(reviews)
+
+
+# For every review body, climb to the smallest ancestor that holds a rating (the
+# review card), never into one holding another review body or more than one
+# rating / title, so a single-review page does not pick up the product's
+# overall rating badge; then read the rating and title inside that card.
+EXTRACT_CARDS_JS = """
+const [bodySel, ratingSel, titleSel] = arguments;
+const read = (el, visible) => el ? ((visible ? el.innerText : el.textContent) || "").trim() : null;
+const count = (el, sel) => el.querySelectorAll(sel).length;
+return Array.from(document.querySelectorAll(bodySel), body => {
+    let card = body;
+    while (card.parentElement && !card.querySelector(ratingSel)) {
+        const parent = card.parentElement;
+        if (count(parent, bodySel) > 1 || count(parent, ratingSel) > 1 || count(parent, titleSel) > 1) {
+            break;
+        }
+        card = parent;
+    }
+    return {
+        text: read(body, true),
+        rating: read(card.querySelector(ratingSel), false),
+        title: read(card.querySelector(titleSel), true),
+    };
+});
+"""
+CARD_SELECTORS = {
+    "amazon": ('span[data-hook="review-body"]', ".review-rating", 'a[data-hook="review-title"]'),
+    "flipkart": (".ZmyHeo", ".XQDdHH", "p.z9E0IG"),
+}
+
+
+def extract_cards(browser, site):
+    """All review cards of the loaded page in a single WebDriver round-trip."""
+    return card_records(browser.execute_script(EXTRACT_CARDS_JS, *CARD_SELECTORS[site]) or [])
+
+
+SITES = {
+    "amazon": (AMAZON_REVIEW_BODY, extract_amazon_page),
+    "flipkart": (FLIPKART_REVIEW_BODY, extract_flipkart_page),
+}
+
+
+def extract_page(browser, site, mode=SCRAPE_EXTRACTION):
+    if mode == "script":
+        return extract_cards(browser, site)
+    return SITES[site][1](browser)
+
+
+def scrape_page(site, url):
+    """Load one review page in a pooled browser and extract its records ([] on failure)."""
+    body_locator = SITES[site][0]
+    timer = StepTimer(site)
+    try:
+        with browser_pool.checkout() as browser:
+            load_stats.begin(browser)
+            with span("page_load"), timer.step("page_load", replaced_sleep=3):
+                browser.get(url)
+                browser_pool.note_page(browser)
+                wait_for_ready(browser)
+                wait_for_count(browser, body_locator)
+            load_stats.measure(browser, site)
+            with span("extract"), timer.step("extract"):
+                return extract_page(browser, site)
+    except Exception as e:
+        print(f"[WARN] Error while scraping {url}: {e}")
+        return []
+    finally:
+        timer.report()
+
+
+def fetch_page(site, url, first=False, backend=SCRAPER_BACKEND):
+    """One review page over HTTP, falling back to a pooled browser when HTTP is blocked or JS-only."""
+    if backend != "browser":
+        records, problem = http_scraper.scrape_page(site, url, expect_reviews=first)
+        if problem is None or backend == "http":
+            return records
+        print(f"[INFO] HTTP scrape of {url} unusable ({problem}); falling back to the browser")
+    return scrape_page(site, url)
+
+
+def iter_flipkart_reviews(browser, url):
+    """Click through Flipkart pages serially; used when page URLs cannot be derived."""
+    timer = StepTimer("flipkart")
+    load_stats.begin(browser)
+    browser.get(url)
+    browser_pool.note_page(browser)
+    with timer.step("page_load", replaced_sleep=3):
+        wait_for_ready(browser)
+        wait_for_count(browser, FLIPKART_REVIEW_BODY)
+    load_stats.measure(browser, "flipkart")
+    wait = WebDriverWait(browser, 15)
+
+    for _ in range(2):
+        try:
+            review_elements = browser.find_elements(*FLIPKART_REVIEW_BODY)
+            records = extract_page(browser, "flipkart")
+        except Exception as e:
+            print(f"[WARN] Flipkart scraping stopped: {e}")
+            break
+
+        # hand the page to the consumer before waiting on the next one
+        yield records
+
+        try:
+            next_button = wait.until(
+                EC.element_to_be_clickable((By.XPATH, '//a[@class="_9QVEpD"]/span[contains(text(),"Next")]'))
+            )
+            browser.execute_script("arguments[0].scrollIntoView();", next_button)
+            with timer.step("scroll_to_next", replaced_sleep=2):
+                wait.until(EC.element_to_be_clickable(next_button))
+            next_button.click()
+            browser_pool.note_page(browser)
+            with timer.step("next_page", replaced_sleep=3):
+                if review_elements:
+                    wait_for_stale(browser, review_elements[0])
+                wait_for_ready(browser)
+                wait_for_count(browser, FLIPKART_REVIEW_BODY)
+            load_stats.measure(browser, "flipkart")
+        except:
+            break
+
+    timer.report()
+
+
+def iter_review_pages(product_url, page_budget=SCRAPE_PAGE_BUDGET, concurrency=SCRAPE_CONCURRENCY,
+                      backend=SCRAPER_BACKEND):
+    """
+    Yield review records page by page, in page order. Review-listing URLs are
+    computed up front and up to `concurrency` pages load at once (over HTTP or
+    in pooled browsers, see `fetch_page`); URLs the page scheme does not cover
+    are scraped as a single page, as is the product page itself when the first
+    listing page has no reviews (Amazon listings can require sign-in).
+    """
+    if "amazon" in product_url:
+        site = "amazon"
+    elif "flipkart" in product_url:
+        site = "flipkart"
+    else:
+        raise ValueError("Unsupported website. Only Amazon and Flipkart are supported.")
+
+    urls = review_page_urls(product_url, page_budget)
+    if urls:
+        print(f"[INFO] Scraping up to {len(urls)} {site} review pages, {concurrency} at a time")
+        found = False
+        for records in fetch_in_order(lambda url: fetch_page(site, url, url == urls[0], backend), urls, concurrency):
+            found = True
+            yield records
+        if found or urls[0] == product_url:
+            return
+        print(f"[INFO] No reviews on {urls[0]}; scraping the product page instead")
+        records = fetch_page(site, product_url, first=True, backend=backend)
+        if records:
+            yield records
+    elif site == "flipkart":
+        with browser_pool.checkout() as browser:
+            yield from iter_flipkart_reviews(browser, product_url)
+    else:
+        records = fetch_page(site, product_url, first=True, backend=backend)
+        if records:
+            yield records
+
+
+def resolve_with_browser(url):
+    """Follow JS redirects in a pooled headless browser."""
+    with browser_pool.checkout() as browser:
+        browser.get(url)
+        browser_pool.note_page(browser)
+        resolved = wait_for_url(browser, lambda u: "amazon." in u, timeout=10)
+        return resolved or browser.current_url
@@ -0,0 +1,163 @@
+"""
+Sentiment backends for the /scrape route.
+
+`transformer` (default): all reviews are tokenized in a single call, grouped
+into length-sorted batches that are padded only to the longest review in the
+batch, and run through the classifier behind the HuggingFace sentiment
+pipeline one batch at a time.
+
+`tfidf-mlp`: the 4140 -> 128 -> 3 MLP shipped as sentiment_model.pth over
+tfidf_vectorizer.pkl. The TF-IDF matrix stays sparse and the first layer is a
+sparse x dense product, so it costs well under a millisecond per review.
+
+Backends are chosen per request or with the SENTIMENT_BACKEND env variable.
+"""
+import os
+import threading
+
+import numpy as np
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "transformer")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))
+SENTIMENT_SORT_BY_LENGTH = os.getenv("SENTIMENT_SORT_BY_LENGTH", "1") != "0"
+SENTIMENT_MAX_LENGTH = 512
+
+
+def _batches(order, batch_size):
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+def predict_sentiments(texts, sentiment_pipeline, batch_size=None, sort_by_length=None):
+    """
+    Classify a list of review texts in padded batches.
+    Returns [{"label": str, "score": float}, ...] in the same order as `texts`.
+    """
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    if sort_by_length is None:
+        sort_by_length = SENTIMENT_SORT_BY_LENGTH
+
+    texts = [str(t) if t is not None else "" for t in texts]
+    if not texts:
+        return []
+
+    tokenizer = sentiment_pipeline.tokenizer
+    model = sentiment_pipeline.model
+    id2label = model.config.id2label
+
+    # one tokenizer call for every review, no padding yet
+    encoded = tokenizer(texts, truncation=True, max_length=SENTIMENT_MAX_LENGTH)
+    input_ids = encoded["input_ids"]
+
+    order = list(range(len(texts)))
+    if sort_by_length:
+        order.sort(key=lambda i: len(input_ids[i]))
+
+    import torch
+
+    results = [None] * len(texts)
+    model.eval()
+    with torch.no_grad():
+        for idx in _batches(order, batch_size):
+            features = [{k: encoded[k][i] for k in encoded.keys()} for i in idx]
+            batch = tokenizer.pad(features, padding=True, return_tensors="pt")
+            logits = model(**batch).logits
+            probs = torch.softmax(logits, dim=-1)
+            scores, labels = probs.max(dim=-1)
+            for i, label, score in zip(idx, labels.tolist(), scores.tolist()):
+                results[i] = {"label": id2label[label], "score": float(score)}
+
+    return results
+
+
+# ----------------------------------------------------------------------------- #
+# Backends
+# ----------------------------------------------------------------------------- #
+class TransformerBackend:
+    name = "transformer"
+    # torch forward passes go through the shared inference thread
+    uses_torch = True
+
+    def __init__(self, sentiment_pipeline):
+        self.pipeline = sentiment_pipeline
+
+    def predict(self, texts):
+        return predict_sentiments(texts, self.pipeline)
+
+
+class TfidfMlpBackend:
+    name = "tfidf-mlp"
+    # numpy only: cheaper to run inline than to queue behind torch batches
+    uses_torch = False
+
+    def __init__(self, vectorizer, classes, w1, b1, w2, b2):
+        self.vectorizer = vectorizer
+        self.classes = np.asarray(classes)
+        # weights kept as (in, out) so the first layer is a CSR @ dense product
+        self.w1, self.b1, self.w2, self.b2 = w1, b1, w2, b2
+        vocab_size = len(vectorizer.vocabulary_)
+        if vocab_size != w1.shape[0]:
+            raise ValueError(f"TF-IDF vocabulary ({vocab_size}) does not match model input ({w1.shape[0]})")
+
+    @classmethod
+    def from_files(cls, model_path=os.path.join(MODEL_DIR, "sentiment_model.pth"),
+                   tfidf_path=os.path.join(MODEL_DIR, "tfidf_vectorizer.pkl"),
+                   label_encoder_path=os.path.join(MODEL_DIR, "label_encoder.pkl")):
+        """Load the shipped .pth / .pkl artifacts."""
+        import joblib
+        import torch
+
+        state = torch.load(model_path, map_location=torch.device("cpu"), weights_only=True)
+        return cls(
+            joblib.load(tfidf_path),
+            joblib.load(label_encoder_path).classes_,
+            np.ascontiguousarray(state["fc1.weight"].numpy().T, dtype=np.float32),
+            state["fc1.bias"].numpy().astype(np.float32),
+            np.ascontiguousarray(state["fc2.weight"].numpy().T, dtype=np.float32),
+            state["fc2.bias"].numpy().astype(np.float32),
+        )
+
+    def predict(self, texts):
+        texts = [str(t) if t is not None else "" for t in texts]
+        if not texts:
+            return []
+        features = self.vectorizer.transform(texts).astype(np.float32)
+        hidden = features @ self.w1
+        hidden += self.b1
+        np.maximum(hidden, 0, out=hidden)
+        logits = hidden @ self.w2 + self.b2
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        labels = self.classes[best]
+        return [{"label": str(label), "score": float(probs[i, j])}
+                for i, (label, j) in enumerate(zip(labels, best))]
+
+
+_factories = {TfidfMlpBackend.name: TfidfMlpBackend.from_files}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """Register a zero-argument factory; the backend is built on first use."""
+    with _backends_lock:
+        _factories[name] = factory
+        _backends.pop(name, None)
+
+
+def available_backends():
+    return sorted(_factories)
+
+
+def get_backend(name=None):
+    name = name or SENTIMENT_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            if name not in _factories:
+                raise KeyError(f"Unknown sentiment backend '{name}'. Choose one of {available_backends()}")
+            print(f"[INFO] Loading sentiment backend: {name}")
+            _backends[name] = _factories[name]()
+        return _backends[name]
@@ -0,0 +1,55 @@
+"""
+Incremental sentiment over review pages as they are scraped.
+
+Each scraped page is submitted for inference straight away (to the shared
+inference scheduler's thread), so the model works on page N while the browser
+is still waiting for page N+1. Analyzed pages are yielded in scrape order as
+soon as they are ready.
+"""
+import json
+import os
+from collections import deque
+
+STREAM_MIN_BATCH = int(os.getenv("STREAM_MIN_BATCH", "8"))
+
+
+def _attach(records, predictions):
+    for record, prediction in zip(records, predictions):
+        record["predicted_sentiment"] = prediction["label"]
+        record["sentiment_score"] = round(prediction["score"], 4)
+    return records
+
+
+def analyze_pages(pages, submit, min_batch=STREAM_MIN_BATCH):
+    """
+    Consume an iterable of review-record pages and yield lists of records with
+    sentiment attached. `submit(texts)` must return a Future of predictions.
+    Pages smaller than `min_batch` are merged with the following page(s) to
+    keep batches reasonably full.
+    """
+    pending = deque()
+    buffered = []
+
+    def enqueue(records):
+        texts = [r["review_text"] for r in records]
+        pending.append((records, submit(texts)))
+
+    for records in pages:
+        buffered.extend(records)
+        if len(buffered) >= min_batch:
+            enqueue(buffered)
+            buffered = []
+        while pending and pending[0][1].done():
+            records, future = pending.popleft()
+            yield _attach(records, future.result())
+
+    if buffered:
+        enqueue(buffered)
+    while pending:
+        records, future = pending.popleft()
+        yield _attach(records, future.result())
+
+
+def sse_event(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
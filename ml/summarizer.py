@@ -0,0 +1,91 @@
+"""
+Local extractive review summaries.
+
+Reviews are split into sentences, each sentence is vectorized (by default with
+the TF-IDF vectorizer shipped for the tfidf-mlp sentiment model), and sentences
+are ranked by degree centrality: the sum of a sentence's cosine similarities to
+all the others, which for L2-normalized rows is one product with the column
+sum. Sentences are picked greedily by centrality, skipping near-duplicates of
+ones already picked, until the character budget is used, and returned in their
+original order. No network hop; the cost is bounded by SUMMARY_MAX_SENTENCES.
+"""
+import os
+import re
+
+import numpy as np
+
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "400"))
+SUMMARY_MAX_SENTENCES = int(os.getenv("SUMMARY_MAX_SENTENCES", "500"))
+SUMMARY_DEDUPE_THRESHOLD = float(os.getenv("SUMMARY_DEDUPE_THRESHOLD", "0.8"))
+SUMMARY_MIN_WORDS = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(reviews, min_words=SUMMARY_MIN_WORDS, max_sentences=SUMMARY_MAX_SENTENCES):
+    """Sentences of `reviews` with at least `min_words` words, at most `max_sentences` of them."""
+    sentences = []
+    for review in reviews:
+        for sentence in _SENTENCE_END.split(review or ""):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= min_words:
+                sentences.append(sentence)
+                if len(sentences) >= max_sentences:
+                    return sentences
+    return sentences
+
+
+def _dense(x):
+    return np.asarray(x.todense() if hasattr(x, "todense") else x, dtype=np.float32)
+
+
+def _normalize_rows(matrix):
+    if hasattr(matrix, "multiply"):
+        norms = np.sqrt(_dense(matrix.multiply(matrix).sum(axis=1))).ravel()
+        return matrix.multiply(1.0 / np.where(norms == 0, 1.0, norms)[:, None]).tocsr()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class ExtractiveSummarizer:
+    """`vectorize(sentences)` returns one row per sentence, dense or scipy-sparse."""
+
+    def __init__(self, vectorize=None, max_chars=SUMMARY_MAX_CHARS, max_sentences=SUMMARY_MAX_SENTENCES,
+                 dedupe_threshold=SUMMARY_DEDUPE_THRESHOLD):
+        self.vectorize = vectorize or self.fit_tfidf
+        self.max_chars = max_chars
+        self.max_sentences = max_sentences
+        self.dedupe_threshold = dedupe_threshold
+
+    @staticmethod
+    def fit_tfidf(sentences):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        return TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(sentences)
+
+    def rank(self, sentences):
+        """Degree centrality of every sentence and the normalized sentence matrix."""
+        matrix = _normalize_rows(self.vectorize(sentences))
+        column_sum = _dense(matrix.sum(axis=0)).ravel()
+        return _dense(matrix @ column_sum).ravel(), matrix
+
+    def summarize(self, reviews):
+        sentences = split_sentences(reviews, max_sentences=self.max_sentences)
+        if len(sentences) <= 1:
+            return " ".join(reviews)[:self.max_chars].strip()
+
+        scores, matrix = self.rank(sentences)
+        chosen, used = [], 0
+        for i in np.argsort(-scores, kind="stable"):
+            if used + len(sentences[i]) > self.max_chars and chosen:
+                continue
+            if chosen:
+                sims = _dense(matrix[chosen] @ matrix[i].T).ravel()
+                if sims.max() >= self.dedupe_threshold:
+                    continue
+            chosen.append(int(i))
+            used += len(sentences[i]) + 1
+            if used >= self.max_chars:
+                break
+        summary = " ".join(sentences[i] for i in sorted(chosen))
+        return summary[:self.max_chars].rstrip() if len(summary) > self.max_chars else summary
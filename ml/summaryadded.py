@@ -16,85 +16,35 @@ import undetected_chromedriver as uc
 from flask_cors import CORS
 import spacy
 from transformers import AutoTokenizer, AutoModel, pipeline
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from statistics import mode
-import requests
+from keyphrases import KeyphraseEngine, load_noun_chunker
+from summarizer import ExtractiveSummarizer
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
-API_TOKEN = os.getenv("HF_API_TOKEN")
-API_URL = os.getenv("API_URL")
 BACKEND_API_URL = os.getenv("BACKEND_API_URL")
 app = Flask(__name__)
 CORS(app)
 warnings.filterwarnings("ignore", category=ResourceWarning)
 
-nlp = spacy.load("en_core_web_sm")
+nlp = load_noun_chunker(spacy)
 tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
 bert_model = AutoModel.from_pretrained("bert-base-uncased")
-#API_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-headers = {"Authorization": f"Bearer {API_TOKEN}"}
+keyphrase_engine = KeyphraseEngine(nlp, tokenizer, bert_model)
+summarizer = ExtractiveSummarizer()
 
 
 
 def generate_review_summary(reviews):
     try:
-        combined_reviews = " ".join(reviews)
-        review_word_count = len(combined_reviews.split())
-        max_length = min(150, review_word_count // 2)
-        # max_length = 200
-        # min_length = 100
-        min_length = max(40, max_length // 2)
-
-        if len(combined_reviews.split()) > 1024:
-            combined_reviews = " ".join(combined_reviews.split()[:1024])
-        payload = {
-            "inputs": combined_reviews,
-            "parameters": {
-                "min_length": min_length,
-                "max_length": max_length,
-                "do_sample": False,
-            },
-        }
-        response = requests.post(API_URL, headers=headers, json=payload)
-        summary = response.json()[0]["summary_text"]
-        if response.status_code == 200:
-            return summary
-        else:
-            return "Unable to create summary"
+        return summarizer.summarize(reviews)
     except Exception as e:
         print(f"Error generating summary: {str(e)}")
         return "Unable to create summary"
 
-def extract_noun_phrases(text):
-    doc = nlp(text)
-    noun_phrases = []
-    for chunk in doc.noun_chunks:
-        noun_phrases.append(chunk.text)
-    return noun_phrases
-
-
-def get_bert_embedding(text):
-    inputs = tokenizer(
-        text, return_tensors="pt", padding=True, truncation=True, max_length=512
-    )
-    with torch.no_grad():
-        outputs = bert_model(**inputs)
-    return outputs.last_hidden_state.mean(dim=1).squeeze().numpy()
-
-
 def extract_keyphrases(text, top_n=5):
-    noun_phrases = extract_noun_phrases(text)
-    if not noun_phrases:
-        return []
-    doc_embedding = get_bert_embedding(text)
-    phrase_embeddings = [get_bert_embedding(phrase) for phrase in noun_phrases]
-    similarities = cosine_similarity([doc_embedding], phrase_embeddings)[0]
-    sorted_indices = np.argsort(similarities)[::-1]
-    top_keyphrases = [noun_phrases[i] for i in sorted_indices[:top_n]]
-    return top_keyphrases
+    return keyphrase_engine.extract(text, top_n=top_n)
 
 
 class SentimentModel(nn.Module):
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the service modules are flat files in ml/, imported by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
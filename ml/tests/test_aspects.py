@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from aspects import aspect_sentiment  # noqa: E402
+from keyphrases import Ranking  # noqa: E402
+
+
+def make_ranking():
+    candidates = [("battery", "battery", 3), ("screen", "screen", 2), ("battery life", "battery life", 2)]
+    mentions = [{"battery", "battery life"}, {"screen"}, {"battery"}, {"screen", "battery life"}]
+    return Ranking(candidates, mentions, np.array([0.9, 0.8, 0.7], dtype=np.float32), {})
+
+
+def test_aspect_sentiment_counts_and_shares():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.95, 0.1]], dtype=np.float32)
+    aspects = aspect_sentiment(make_ranking(), vectors, ["positive", "negative", "positive", "negative"],
+                               [0.9, 0.8, 0.7, 0.6], n_aspects=2)
+
+    by_name = {a["aspect"]: a for a in aspects}
+    assert set(by_name) == {"battery", "screen"}
+    # "battery life" folds into "battery": reviews 0, 2 and 3
+    assert by_name["battery"]["mentions"] == 3
+    assert by_name["battery"]["sentiment"] == {"negative": 1, "positive": 2}
+    assert by_name["battery"]["share"] == {"negative": 0.333, "positive": 0.667}
+    assert by_name["screen"]["dominant"] == "negative"
+
+
+def test_aspect_sentiment_is_json_serializable():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.95, 0.1]], dtype=np.float32)
+    aspects = aspect_sentiment(make_ranking(), vectors, ["positive", "negative", "positive", "negative"],
+                               np.array([0.9, 0.8, 0.7, 0.6], dtype=np.float32), n_aspects=2)
+
+    assert aspects
+    json.dumps(aspects)
+    for aspect in aspects:
+        assert all(type(v) is float for v in aspect["share"].values())
+        assert type(aspect["mean_confidence"]) is float
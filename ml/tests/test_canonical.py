@@ -0,0 +1,44 @@
+import pytest
+
+from canonical import product_key
+
+# URL variants that must collapse to the same key.
+CANONICAL_URL_CORPUS = {
+    "amazon.in:B0CHX1W1XY": [
+        "https://www.amazon.in/Apple-iPhone-15-128-GB/dp/B0CHX1W1XY",
+        "https://www.amazon.in/Apple-iPhone-15-128-GB/dp/B0CHX1W1XY/ref=sr_1_1?crid=2X&keywords=iphone+15&qid=1700000000&sr=8-1",
+        "https://www.amazon.in/dp/B0CHX1W1XY?th=1&psc=1",
+        "https://amazon.in/dp/b0chx1w1xy/",
+        "https://www.amazon.in/gp/product/B0CHX1W1XY/ref=ppx_yo_dt_b_asin_title_o00_s00?ie=UTF8&psc=1",
+        "https://m.amazon.in/gp/aw/d/B0CHX1W1XY",
+        "https://www.amazon.in/product-reviews/B0CHX1W1XY/ref=cm_cr_dp_d_show_all_btm?ie=UTF8&reviewerType=all_reviews",
+        "https://www.amazon.in/Apple-iPhone-15-128-GB/product-reviews/B0CHX1W1XY?pageNumber=2",
+        "https://www.amazon.in/gp/offer-listing/?asin=B0CHX1W1XY",
+        "www.amazon.in/dp/B0CHX1W1XY#customerReviews",
+    ],
+    "amazon.com:B08N5WRWNW": [
+        "https://www.amazon.com/Echo-Dot-4th-Gen/dp/B08N5WRWNW",
+        "https://www.amazon.com/dp/B08N5WRWNW?tag=affiliate-20&linkCode=ll1",
+        "https://smile.amazon.com/dp/B08N5WRWNW",
+        "https://www.amazon.com/exec/obidos/ASIN/B08N5WRWNW/",
+    ],
+    "flipkart:MOBGTAGPTB3VS24W": [
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W",
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W&lid=LSTMOBGTAGPTB3VS24WKFODHL&marketplace=FLIPKART&q=iphone+15&store=tyy%2F4io&srno=s_1_1&otracker=search",
+        "https://dl.flipkart.com/s/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W&cmpid=product.share.pp",
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/product-reviews/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W&lid=LSTMOBGTAGPTB3VS24WKFODHL&marketplace=FLIPKART",
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/product-reviews/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W&page=3",
+        "https://m.flipkart.com/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4?pid=mobgtagptb3vs24w",
+    ],
+    "flipkart:itm6ac6485515ae4": [
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4",
+        "https://www.flipkart.com/apple-iphone-15-black-128-gb/p/itm6ac6485515ae4?otracker=search",
+    ],
+}
+
+
+@pytest.mark.parametrize("url, expected", [
+    (url, key) for key, urls in CANONICAL_URL_CORPUS.items() for url in urls
+])
+def test_product_key(url, expected):
+    assert product_key(url) == expected
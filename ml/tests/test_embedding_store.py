@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from embedding_store import EmbeddingStore  # noqa: E402
+
+
+def test_similar_reviews_excludes_product_with_few_other_rows(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=3)
+    store.add("amazon.in:A1", ["great battery", "poor screen"], np.eye(3)[:2], "https://a/1")
+    store.add("amazon.in:B2", ["battery lasts"], np.array([[1.0, 0.1, 0.0]]), "https://a/2")
+
+    results = store.similar_reviews(np.array([1.0, 0.0, 0.0]), k=5, exclude_product_key="amazon.in:A1")
+
+    assert [r["product_key"] for r in results] == ["amazon.in:B2"]
+    assert all(np.isfinite(r["similarity"]) for r in results)
+
+
+def test_get_or_embed_only_embeds_new_reviews(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=3)
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.ones((len(texts), 3))
+
+    store.get_or_embed("flipkart.com:itm1", ["a", "b"], embed)
+    vectors, embedded = store.get_or_embed("flipkart.com:itm1", ["b", "c"], embed)
+
+    assert embedded == 1
+    assert calls == [["a", "b"], ["c"]]
+    assert vectors.shape == (2, 3)
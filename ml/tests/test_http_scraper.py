@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+pytest.importorskip("selectolax")
+pytest.importorskip("requests")
+
+from selectolax.lexbor import LexborHTMLParser  # noqa: E402
+
+import http_scraper  # noqa: E402
+from records import page_records  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def parse(site, name):
+    return page_records(http_scraper.PARSERS[site](LexborHTMLParser(fixture(name))))
+
+
+def test_parse_amazon_review_page():
+    records = parse("amazon", "amazon_reviews.html")
+
+    assert records == [
+        {"review_text": "Battery easily lasts two days of heavy use. The sound is punchy and the bass is deep.",
+         "rating": 5.0, "review_title": "Excellent battery life"},
+        {"review_text": "Comfortable at first but the ear cushions press too hard.",
+         "rating": 2.0, "review_title": "Ear cushions hurt after an hour"},
+        {"review_text": "Good for the price. Bluetooth pairs quickly.",
+         "rating": 4.0, "review_title": "Value for money"},
+    ]
+
+
+def test_parse_flipkart_review_page():
+    records = parse("flipkart", "flipkart_reviews.html")
+
+    assert records == [
+        {"review_text": "Display is bright and the camera is great in daylight.",
+         "rating": 5.0, "review_title": "Brilliant"},
+        {"review_text": "Heats up while gaming and the battery drains fast.",
+         "rating": 2.0, "review_title": "Not recommended at all"},
+    ]
+
+
+def test_parse_captcha_page_finds_nothing():
+    assert parse("amazon", "amazon_captcha.html") == []
+
+
+@pytest.mark.parametrize("status, name, found, expected", [
+    (200, "amazon_reviews.html", True, None),
+    (200, "flipkart_reviews.html", True, None),
+    (200, "amazon_captcha.html", False, "blocked"),
+    (503, "amazon_reviews.html", False, "blocked"),
+    (404, "amazon_reviews.html", False, "http-404"),
+    (200, "flipkart_js_shell.html", False, "js-only"),
+])
+def test_classify(status, name, found, expected):
+    assert http_scraper.classify(status, fixture(name), found) == expected
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+@pytest.mark.parametrize("name, expect_reviews, count, problem", [
+    ("flipkart_reviews.html", True, 2, None),
+    ("amazon_captcha.html", True, 0, "blocked"),
+    ("flipkart_js_shell.html", False, 0, "js-only"),
+])
+def test_scrape_page(monkeypatch, name, expect_reviews, count, problem):
+    html = fixture(name)
+    monkeypatch.setattr(http_scraper.http_session, "get", lambda url, **kwargs: FakeResponse(200, html))
+    site = "amazon" if name.startswith("amazon") else "flipkart"
+
+    records, found_problem = http_scraper.scrape_page(site, "https://example.test/reviews", expect_reviews)
+
+    assert (len(records), found_problem) == (count, problem)
+
+
+def test_scrape_page_reports_request_errors(monkeypatch):
+    def fail(url, **kwargs):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(http_scraper.http_session, "get", fail)
+
+    assert http_scraper.scrape_page("amazon", "https://example.test/reviews") == (
+        [], "request-failed: connection reset")
@@ -0,0 +1,46 @@
+import threading
+
+from inference_scheduler import InferenceScheduler
+
+
+def test_large_submission_is_split_and_interleaved():
+    scheduler = InferenceScheduler(max_batch=4, max_wait_ms=0)
+    calls = []
+    first_call = threading.Event()
+    release = threading.Event()
+
+    def handler(items):
+        calls.append(list(items))
+        first_call.set()
+        release.wait(5)
+        return [item * 10 for item in items]
+
+    scheduler.register("double", handler)
+    bulk = scheduler.submit("double", range(10))
+    first_call.wait(5)
+    small = scheduler.submit("double", [100])
+    release.set()
+
+    assert bulk.result(5) == [i * 10 for i in range(10)]
+    assert small.result(5) == [1000]
+    assert max(len(c) for c in calls) <= 4
+    # the small chunk runs right after the first slice, not after the whole submission
+    assert 100 in calls[1]
+
+
+def test_failed_slice_fails_the_submission():
+    scheduler = InferenceScheduler(max_batch=2, max_wait_ms=0)
+
+    def handler(items):
+        if 3 in items:
+            raise ValueError("bad item")
+        return items
+
+    scheduler.register("check", handler)
+    future = scheduler.submit("check", range(6))
+    try:
+        future.result(5)
+    except ValueError as e:
+        assert str(e) == "bad item"
+    else:
+        raise AssertionError("expected the slice's error")
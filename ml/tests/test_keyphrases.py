@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from keyphrases import KeyphraseEngine  # noqa: E402
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDoc:
+    def __init__(self, text):
+        # every comma-separated part of a review stands in for one noun chunk
+        self.noun_chunks = [Chunk(part) for part in text.split(",") if part.strip()]
+
+
+class FakeNlp:
+    def pipe(self, texts, batch_size=None, n_process=None):
+        return (FakeDoc(text) for text in texts)
+
+
+class SlowEmbedder:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.seconds)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_embedding_stops_at_the_budget_and_keeps_frequent_phrases():
+    reviews = ["battery, screen, p1", "battery, screen, p2", "battery, p3", "p4, p5, p6"]
+    embedder = SlowEmbedder(0.05)
+    engine = KeyphraseEngine(FakeNlp(), embed_fn=embedder, batch_size=2)
+
+    ranking = engine.rank(reviews, budget_ms=40, max_candidates=100, min_count=1)
+
+    # the first batch always runs; the deadline has passed before the second
+    assert embedder.batches == [["battery", "screen"]]
+    assert ranking.keys == ["battery", "screen"]
+    assert ranking.stats["candidates_over_budget"] == 6
+
+
+def test_without_budget_every_candidate_is_ranked():
+    embedder = SlowEmbedder(0)
+    engine = KeyphraseEngine(FakeNlp(), embed_fn=embedder, batch_size=2)
+
+    ranking = engine.rank(["battery, screen", "battery, charger"], budget_ms=None, max_candidates=100, min_count=1)
+
+    assert sorted(ranking.keys) == ["battery", "charger", "screen"]
+    assert ranking.stats["candidates_over_budget"] == 0
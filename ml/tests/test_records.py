@@ -0,0 +1,37 @@
+from records import card_records, clean_title, page_records, parse_rating
+
+
+def test_parse_rating():
+    assert parse_rating("4.0 out of 5 stars") == 4.0
+    assert parse_rating("5★") == 5.0
+    assert parse_rating(" 3 ") == 3.0
+    assert parse_rating("") is None
+    assert parse_rating(None) is None
+
+
+def test_clean_title_strips_hidden_star_text():
+    assert clean_title("5.0 out of 5 stars Excellent battery life") == "Excellent battery life"
+    assert clean_title("  Value for money ") == "Value for money"
+    assert clean_title(None) == ""
+
+
+def test_page_records_truncates_to_shortest_column():
+    records = page_records({"review_text": ["a", "b", "c"], "rating": [5.0, 4.0], "review_title": ["x", "y", "z"]})
+
+    assert records == [
+        {"review_text": "a", "rating": 5.0, "review_title": "x"},
+        {"review_text": "b", "rating": 4.0, "review_title": "y"},
+    ]
+
+
+def test_card_records_keeps_fields_per_card_and_drops_empty_bodies():
+    cards = [
+        {"text": " Great phone ", "rating": "5", "title": "Brilliant"},
+        {"text": "   ", "rating": "1", "title": "Empty"},
+        {"text": "Heats up", "rating": None, "title": "2.0 out of 5 stars Not good"},
+    ]
+
+    assert card_records(cards) == [
+        {"review_text": "Great phone", "rating": 5.0, "review_title": "Brilliant"},
+        {"review_text": "Heats up", "rating": None, "review_title": "Not good"},
+    ]
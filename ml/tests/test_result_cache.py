@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from result_cache import ResultCache  # noqa: E402
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection to see the queries ResultCache makes."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.filters = []
+
+    def find_one(self, query, sort=None):
+        self.filters.append(query)
+        fresh = query["timestamp"]["$gte"]
+        matches = [d for d in self.docs if d["productKey"] == query["productKey"] and d["timestamp"] >= fresh]
+        return max(matches, key=lambda d: d["timestamp"], default=None)
+
+
+def test_get_ignores_mongo_entries_older_than_ttl():
+    now = datetime.utcnow()
+    collection = FakeCollection([
+        {"productKey": "amazon.in:OLD", "searchResponse": {"total_reviews": 1}, "timestamp": now - timedelta(days=40)},
+        {"productKey": "amazon.in:NEW", "searchResponse": {"total_reviews": 2}, "timestamp": now - timedelta(days=1)},
+    ])
+    cache = ResultCache(collection, ttl=30 * 24 * 3600)
+
+    assert cache.get("amazon.in:OLD") is None
+    assert cache.get("amazon.in:NEW") == {"total_reviews": 2}
+    assert all(f["cacheEntry"] is True for f in collection.filters)
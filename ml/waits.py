@@ -0,0 +1,90 @@
+"""
+Condition-driven waits for the Selenium scrapers.
+
+These replace fixed `time.sleep` calls: each helper returns as soon as its
+condition holds (or gives up after `timeout`), and `StepTimer` logs how long
+each step actually took next to the fixed sleep it replaced.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+SCRAPE_WAIT_TIMEOUT = float(os.getenv("SCRAPE_WAIT_TIMEOUT", "15"))
+SCRAPE_POLL_INTERVAL = float(os.getenv("SCRAPE_POLL_INTERVAL", "0.2"))
+
+
+def _until(browser, condition, timeout):
+    try:
+        return WebDriverWait(
+            browser,
+            SCRAPE_WAIT_TIMEOUT if timeout is None else timeout,
+            poll_frequency=SCRAPE_POLL_INTERVAL,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(condition)
+    except TimeoutException:
+        return None
+
+
+def wait_for_ready(browser, timeout=None):
+    """Wait until document.readyState is 'complete'."""
+    ready = _until(
+        browser,
+        lambda b: b.execute_script("return document.readyState") == "complete",
+        timeout,
+    )
+    return bool(ready)
+
+
+def wait_for_count(browser, locator, min_count=1, timeout=None):
+    """Wait until at least `min_count` elements match `locator`; returns them ([] on timeout)."""
+    def enough(b):
+        found = b.find_elements(*locator)
+        return found if len(found) >= min_count else False
+
+    return _until(browser, enough, timeout) or []
+
+
+def wait_for_stale(browser, element, timeout=None):
+    """Wait until `element` is detached from the DOM, i.e. the page content was replaced."""
+    return bool(_until(browser, EC.staleness_of(element), timeout))
+
+
+def wait_for_url(browser, predicate, timeout=None):
+    """Wait until `predicate(browser.current_url)` is true; returns the URL or None."""
+    return _until(browser, lambda b: b.current_url if predicate(b.current_url) else False, timeout)
+
+
+class StepTimer:
+    """Per-step wall-clock timings for one scrape, compared against the fixed sleeps they replaced."""
+
+    def __init__(self, name):
+        self.name = name
+        self.steps = []
+
+    @contextmanager
+    def step(self, label, replaced_sleep=0.0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.steps.append((label, elapsed, replaced_sleep))
+            note = f" (fixed sleep was {replaced_sleep:.1f}s)" if replaced_sleep else ""
+            print(f"[TIMING] {self.name}.{label}: {elapsed:.2f}s{note}")
+
+    @property
+    def total(self):
+        return sum(elapsed for _, elapsed, _ in self.steps)
+
+    @property
+    def saved(self):
+        # steps that never had a sleep (e.g. extraction) have nothing to compare against
+        return sum(replaced - elapsed for _, elapsed, replaced in self.steps if replaced > 0)
+
+    def report(self):
+        print(f"[TIMING] {self.name}: waited {self.total:.2f}s over {len(self.steps)} steps, "
+              f"{self.saved:+.2f}s vs fixed sleeps")